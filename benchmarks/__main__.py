@@ -0,0 +1,293 @@
+"""
+Benchmarks of SubReDo's hot paths on synthetic Projects, Subtitles, and a synthetic MKV.
+
+Each benchmark is timed as the best of several runs and compared to the stored
+baselines. A benchmark fails if it got slower than the baseline by more than the
+threshold, or if its output changed, e.g. a change to the cut math moved Captions.
+"""
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import click
+from rich import print
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.generate import FPS, generate_cues, generate_mkv, generate_project
+from subredo import srt
+from subredo.cuestore import CueStore
+from subredo.pipeline import process_subtitles
+from subredo.planner import get_plan
+from subredo.probe import probe
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import Timestamp
+from subredo.videoredoproject import VideoReDoProject
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# modules too slow to import on every start of the CLI, they must only be imported when used
+HEAVY_MODULES = ("asyncio", "multiprocessing", "pymediainfo", "rich", "sqlite3", "subredo.pipeline", "xml")
+
+BENCHMARKS: dict[str, Callable[[Fixtures], Callable[[], Any]]] = {}
+
+
+def benchmark(func: Callable[[Fixtures], Callable[[], Any]]) -> Callable[[Fixtures], Callable[[], Any]]:
+    """Register a Benchmark. It's given the Fixtures and returns the function to time."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def get_digest(result: Any) -> str:
+    data = result if isinstance(result, bytes) else repr(result).encode("utf8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+class Fixtures:
+    """Synthetic inputs shared by the Benchmarks, generated on first use."""
+    def __init__(self, work_dir: Path, cuts: int, cues: int):
+        self.work_dir = work_dir
+        self.cuts = cuts
+        self.cue_count = cues
+        self._cache: dict[str, Any] = {}
+        self.console = Console(quiet=True)
+        self.frame_time = Timestamp.from_frames(1, FPS)
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        if name not in self._cache:
+            self._cache[name] = factory()
+        return self._cache[name]
+
+    @property
+    def project(self) -> VideoReDoProject:
+        return self._get("project", lambda: generate_project(self.work_dir / "source.mkv", self.cuts))
+
+    @property
+    def project_file(self) -> Path:
+        def factory() -> Path:
+            path = self.work_dir / "project.Vprj"
+            path.write_text(self.project.dumps(), encoding="utf8")
+            return path
+        return self._get("project_file", factory)
+
+    @property
+    def timeline(self) -> TimelineMapper:
+        return self._get("timeline", lambda: TimelineMapper(get_plan(self.project, self.frame_time).timestamps()))
+
+    @property
+    def cues(self) -> list[srt.Cue]:
+        return self._get("cues", lambda: generate_cues(self.cue_count))
+
+    @property
+    def srt_file(self) -> Path:
+        def factory() -> Path:
+            path = self.work_dir / "cues.srt"
+            srt.write(path, self.cues)
+            return path
+        return self._get("srt_file", factory)
+
+    @property
+    def mkv_file(self) -> Path:
+        def factory() -> Path:
+            path = self.work_dir / "source.mkv"
+            generate_mkv(path, generate_cues(3000, duration=600, seed=1), duration=600)
+            return path
+        return self._get("mkv_file", factory)
+
+
+@benchmark
+def project_parse(fixtures: Fixtures) -> Callable[[], Any]:
+    path = fixtures.project_file
+
+    def run():
+        project = VideoReDoProject.load_file(path)
+        return [(cut.cut_time_start, cut.cut_time_end) for cut in project.cut_list]
+    return run
+
+
+@benchmark
+def keep_segments(fixtures: Fixtures) -> Callable[[], Any]:
+    project = fixtures.project
+
+    def run():
+        return get_plan(project, fixtures.frame_time).segments
+    return run
+
+
+@benchmark
+def timeline_map(fixtures: Fixtures) -> Callable[[], Any]:
+    timeline = fixtures.timeline
+    values = [cue.start.ticks for cue in fixtures.cues]
+
+    def run():
+        return timeline.map_many(values).tobytes()
+    return run
+
+
+@benchmark
+def srt_parse(fixtures: Fixtures) -> Callable[[], Any]:
+    path = fixtures.srt_file
+
+    def run():
+        return [(cue.start.ticks, cue.end.ticks, cue.text) for cue in srt.read(path)]
+    return run
+
+
+@benchmark
+def srt_write(fixtures: Fixtures) -> Callable[[], Any]:
+    cues = fixtures.cues
+    path = fixtures.work_dir / "srt_write.srt"
+
+    def run():
+        srt.write(path, cues)
+        return path.read_bytes()
+    return run
+
+
+@benchmark
+def srt_cut(fixtures: Fixtures) -> Callable[[], Any]:
+    cues = fixtures.cues
+    timeline = fixtures.timeline
+
+    def run():
+        return srt.dumps(srt.cut(cues, timeline)).encode("utf8")
+    return run
+
+
+@benchmark
+def cuestore_cut(fixtures: Fixtures) -> Callable[[], Any]:
+    """Memory-map, cut, and write the SubRip file with a CueStore, as the pipeline does."""
+    path = fixtures.srt_file
+    timeline = fixtures.timeline
+    out_path = fixtures.work_dir / "cuestore_cut.srt"
+
+    def run():
+        with CueStore.load(path) as cues:
+            cues.cut(timeline).write(out_path)
+        return out_path.read_bytes()
+    return run
+
+
+@benchmark
+def end_to_end(fixtures: Fixtures) -> Callable[[], Any]:
+    """Probe, demux, and cut the Subtitles of a Project of the synthetic MKV, everything but the final mux."""
+    source = fixtures.mkv_file
+    project = generate_project(source, cuts=20, duration=600)
+
+    def run():
+        summary = probe(source)
+        frame_time = Timestamp.from_frames(1, summary.fps)
+        timeline = TimelineMapper(get_plan(project, frame_time).timestamps())
+        with tempfile.TemporaryDirectory(dir=fixtures.work_dir) as work_dir:
+            cut_files = process_subtitles(source, summary.text_tracks, timeline, Path(work_dir), fixtures.console)
+            return [x.read_bytes() for x in cut_files.values()]
+    return run
+
+
+@benchmark
+def startup(fixtures: Fixtures) -> Callable[[], Any]:
+    """Import the CLI in a new interpreter, like every run of `subredo` does, listing any heavy modules it imports."""
+    root = Path(__file__).resolve().parent.parent
+
+    def run():
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import subredo.main"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True
+        )
+        # e.g. "import time:       499 |      25075 |   click"
+        modules = [line.rsplit("|", maxsplit=1)[-1].strip() for line in process.stderr.splitlines()]
+        return sorted(x for x in modules if x.startswith(HEAVY_MODULES))
+    return run
+
+
+def run_benchmark(name: str, fixtures: Fixtures, repeat: int) -> tuple[float, str]:
+    """Time a Benchmark, returning its best time in seconds and the digest of its output."""
+    func = BENCHMARKS[name](fixtures)
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        # don't time collecting the garbage of the fixtures or previous runs
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, get_digest(result)
+
+
+@click.command()
+@click.argument("names", nargs=-1, type=click.Choice(list(BENCHMARKS)))
+@click.option("-r", "--repeat", type=click.IntRange(min=1), default=5,
+              help="Amount of times to run each Benchmark, the best time is used.")
+@click.option("-t", "--threshold", type=click.FloatRange(min=1), default=1.25,
+              help="Fail if a Benchmark takes this many times longer than its baseline.")
+@click.option("--cuts", type=click.IntRange(min=1), default=2000,
+              help="Amount of Cuts in the synthetic Project.")
+@click.option("--cues", type=click.IntRange(min=1), default=100000,
+              help="Amount of Cues in the synthetic Subtitles.")
+@click.option("--update", is_flag=True, default=False,
+              help="Store the results as the new baselines instead of comparing to them.")
+def main(names: tuple[str, ...], repeat: int, threshold: float, cuts: int, cues: int, update: bool):
+    """
+    Run the Benchmarks, all of them unless NAMES are given.
+
+    Baselines depend on the machine, so store them with --update before making a
+    change and compare against them after. The output digests do not, and should
+    only ever change along with a deliberate change in behaviour.
+    """
+    baselines: dict[str, dict[str, Any]] = {}
+    if BASELINES.exists():
+        baselines = json.loads(BASELINES.read_text(encoding="utf8"))
+
+    table = Table(title="Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Best", justify="right")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Ratio", justify="right")
+    table.add_column("Result")
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="subredo-benchmarks") as work_dir:
+        fixtures = Fixtures(Path(work_dir), cuts, cues)
+        for name in names or BENCHMARKS:
+            seconds, digest = run_benchmark(name, fixtures, repeat)
+            baseline: Optional[dict[str, Any]] = baselines.get(name)
+            if update:
+                baselines[name] = {"seconds": round(seconds, 6), "digest": digest}
+                table.add_row(name, f"{seconds * 1000:.2f} ms", "", "", "[green]stored[/]")
+                continue
+            if not baseline:
+                table.add_row(name, f"{seconds * 1000:.2f} ms", "", "", "[yellow]no baseline[/]")
+                continue
+            ratio = seconds / baseline["seconds"]
+            if baseline["digest"] != digest:
+                result = "[bold red]output changed[/]"
+                failed = True
+            elif ratio > threshold:
+                result = "[bold red]slower[/]"
+                failed = True
+            else:
+                result = "[green]ok[/]"
+            table.add_row(name, f"{seconds * 1000:.2f} ms", f"{baseline['seconds'] * 1000:.2f} ms", f"{ratio:.2f}x", result)
+
+    print(table)
+
+    if update:
+        BASELINES.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf8")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
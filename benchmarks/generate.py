@@ -0,0 +1,146 @@
+"""Generators of synthetic, deterministic inputs for the benchmarks."""
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from subredo import matroska, srt
+from subredo.timecode import Timecode
+from subredo.timestamp import Timestamp, TICKS_PER_SECOND
+from subredo.videoredoproject import ChapterMarker, Cut, VideoReDoProject, VideoReDoVersion
+
+FPS = 25
+
+
+def get_timecode(ticks: int) -> Timecode:
+    seconds, remainder = divmod(ticks, TICKS_PER_SECOND)
+    return Timecode(seconds // 3600, seconds // 60 % 60, seconds % 60, remainder * FPS // TICKS_PER_SECOND)
+
+
+def generate_project(source: Path, cuts: int, duration: int = 4 * 3600, seed: int = 0) -> VideoReDoProject:
+    """
+    Generate a Cut mode Project with `cuts` non-overlapping Cuts over `duration` seconds of Source.
+
+    Some Cuts are duration-less or a single frame long, like VideoReDo sometimes saves.
+    """
+    rng = random.Random(seed)
+    duration_ticks = duration * TICKS_PER_SECOND
+    frame = TICKS_PER_SECOND // FPS
+    points = sorted(rng.sample(range(1, duration_ticks // frame), cuts * 2))
+
+    cut_list = []
+    elapsed = 0
+    for i in range(cuts):
+        start, end = points[i * 2] * frame, points[i * 2 + 1] * frame
+        kind = rng.random()
+        if kind < 0.02:
+            end = start
+        elif kind < 0.04:
+            end = start + frame
+        elapsed += start - (cut_list[-1].cut_time_end if cut_list else 0)
+        cut_list.append(Cut(
+            sequence=i + 1,
+            cut_start=get_timecode(start),
+            cut_end=get_timecode(end),
+            elapsed=get_timecode(elapsed),
+            cut_time_start=start,
+            cut_time_end=end,
+            cut_byte_start=start // 1000,
+            cut_byte_end=end // 1000
+        ))
+
+    chapter_list = [
+        ChapterMarker(i + 1, str(get_timecode(x)), x)
+        for i, x in enumerate(range(0, duration_ticks, 600 * TICKS_PER_SECOND))
+    ]
+
+    return VideoReDoProject(
+        version=3,
+        video_redo_version=VideoReDoVersion(build_number=799, version="6.63.7.836 - Jan 31 2022"),
+        filename=source,
+        description="",
+        stream_type=1,
+        duration=duration_ticks,
+        sync_adjustment=0.0,
+        audio_volume_adjust=1.0,
+        cut_mode=True,
+        video_stream_pid=4113,
+        audio_stream_pid=4352,
+        project_time=0,
+        cut_list=cut_list,
+        chapter_list=chapter_list
+    )
+
+
+def generate_cues(count: int, duration: int = 4 * 3600, seed: int = 0) -> list[srt.Cue]:
+    """Generate `count` Cues in time order, spread over `duration` seconds, some overlapping."""
+    rng = random.Random(seed)
+    step = duration * TICKS_PER_SECOND // count
+    cues = []
+    for i in range(count):
+        start = i * step + rng.randrange(step // 2)
+        end = start + rng.randrange(step // 2, step * 2)
+        text = " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet", "<i>consectetur</i>")) for _ in range(6))
+        if rng.random() < 0.3:
+            text += "\n" + text[::-1]
+        cues.append(srt.Cue(i + 1, Timestamp(start), Timestamp(end), text))
+    return cues
+
+
+def ebml_element(element_id: int, payload: bytes) -> bytes:
+    """Serialize an EBML element with an 8-byte size, like mkvmerge does for large elements."""
+    id_ = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_ + (0x01 << 56 | len(payload)).to_bytes(8, "big") + payload
+
+
+def ebml_uint(element_id: int, value: int) -> bytes:
+    return ebml_element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def ebml_string(element_id: int, value: str) -> bytes:
+    return ebml_element(element_id, value.encode("utf8"))
+
+
+def generate_mkv(path: Path, cues: list[srt.Cue], duration: int = 600, video_size: int = 8192) -> None:
+    """
+    Generate a small Matroska file with a video track and a SubRip track of the Cues.
+
+    The video track is filler data with a frame every 40 ms, in Clusters of 5 seconds,
+    and only Cues within the duration are included. There are no Cues (the index), so
+    every Cluster has to be visited to find the Subtitles.
+    """
+    timestamp_scale = 1000000  # ms
+    tracks = ebml_element(matroska.TRACKS, (
+        ebml_element(matroska.TRACK_ENTRY, (
+            ebml_uint(matroska.TRACK_NUMBER, 1) + ebml_uint(matroska.TRACK_TYPE, matroska.TRACK_TYPE_VIDEO)
+            + ebml_string(matroska.CODEC_ID, "V_MPEG4/ISO/AVC") + ebml_uint(matroska.DEFAULT_DURATION, 40000000)
+        ))
+        + ebml_element(matroska.TRACK_ENTRY, (
+            ebml_uint(matroska.TRACK_NUMBER, 2) + ebml_uint(matroska.TRACK_TYPE, matroska.TRACK_TYPE_SUBTITLE)
+            + ebml_string(matroska.CODEC_ID, "S_TEXT/UTF8") + ebml_string(matroska.LANGUAGE, "eng")
+        ))
+    ))
+    info = ebml_element(matroska.INFO, ebml_uint(matroska.TIMESTAMP_SCALE, timestamp_scale))
+
+    def block(track: int, relative: int, data: bytes) -> bytes:
+        return bytes([0x80 | track]) + relative.to_bytes(2, "big", signed=True) + b"\x00" + data
+
+    video_frame = bytes(video_size)
+    cue_index = 0
+    clusters = []
+    for cluster_start in range(0, duration * 1000, 5000):
+        elements = [ebml_uint(matroska.TIMESTAMP, cluster_start)]
+        for frame_start in range(cluster_start, cluster_start + 5000, 40):
+            elements.append(ebml_element(matroska.SIMPLE_BLOCK, block(1, frame_start - cluster_start, video_frame)))
+            while cue_index < len(cues) and cues[cue_index].start.total_milliseconds() < frame_start + 40:
+                cue = cues[cue_index]
+                start = cue.start.total_milliseconds()
+                elements.append(ebml_element(matroska.BLOCK_GROUP, (
+                    ebml_element(matroska.BLOCK, block(2, start - cluster_start, cue.text.encode("utf8")))
+                    + ebml_uint(matroska.BLOCK_DURATION, cue.end.total_milliseconds() - start)
+                )))
+                cue_index += 1
+        clusters.append(ebml_element(matroska.CLUSTER, b"".join(elements)))
+
+    header = ebml_element(matroska.EBML, ebml_string(matroska.DOC_TYPE, "matroska"))
+    path.write_bytes(header + ebml_element(matroska.SEGMENT, info + tracks + b"".join(clusters)))
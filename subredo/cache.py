@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# amount of bytes hashed from both the start and the end of a Source
+PARTIAL_HASH_SIZE = 1024 * 1024
+
+
+def get_default_cache_dir() -> Path:
+    """Get the default directory to Cache to for the current platform."""
+    if platform.system() == "Windows":
+        root = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+        return root / "SubReDo" / "Cache"
+    root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return root / "subredo"
+
+
+class Cache:
+    """
+    Persistent on-disk Cache of data derived from a Source, like Probes and extracted Subtitle tracks.
+
+    Entries are keyed by the Source's identity, i.e. its path, size, modification time,
+    and a hash of its first and last bytes, so any change to the Source misses the Cache.
+    Each Source gets one entry directory. The least recently used entries are evicted
+    once the Cache grows past its maximum size.
+    """
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+
+    @staticmethod
+    def key(source: Path) -> str:
+        """Get the Cache key of a Source."""
+        stat = source.stat()
+        hash_ = hashlib.blake2b(digest_size=20)
+        hash_.update(f"{source.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf8"))
+        with open(source, "rb") as f:
+            hash_.update(f.read(PARTIAL_HASH_SIZE))
+            if stat.st_size > PARTIAL_HASH_SIZE * 2:
+                f.seek(-PARTIAL_HASH_SIZE, os.SEEK_END)
+                hash_.update(f.read(PARTIAL_HASH_SIZE))
+        return hash_.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        entry = self.path / key
+        if entry.is_dir():
+            # mark as recently used, access times are often not recorded
+            os.utime(entry)
+        return entry
+
+    def get_probe(self, key: str) -> Optional[dict[str, Any]]:
+        """Get the cached Probe of a Source, if any."""
+        probe_file = self._entry(key) / "probe.json"
+        if not probe_file.is_file():
+            return None
+        try:
+            return json.loads(probe_file.read_text(encoding="utf8"))
+        except ValueError:
+            return None
+
+    def put_probe(self, key: str, probe: dict[str, Any]) -> None:
+        """Cache the Probe of a Source."""
+        self._write(key, "probe.json", lambda f: f.write(json.dumps(probe).encode("utf8")))
+
+    def get_file(self, key: str, name: str) -> Optional[Path]:
+        """Get the path to a cached file of a Source, if any. The file must not be modified."""
+        file = self._entry(key) / name
+        if not file.is_file():
+            return None
+        return file
+
+    def put_file(self, key: str, name: str, file: Path) -> Path:
+        """Cache a copy of a file derived from a Source. Returns the path to the cached file."""
+        with open(file, "rb") as src:
+            self._write(key, name, lambda f: shutil.copyfileobj(src, f))
+        return self.path / key / name
+
+    def _write(self, key: str, name: str, writer) -> None:
+        entry = self.path / key
+        entry.mkdir(parents=True, exist_ok=True)
+        # write next to the final file and swap it in, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=entry, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, entry / name)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        os.utime(entry)
+
+    def evict(self) -> int:
+        """Evict the least recently used entries until the Cache fits its maximum size. Returns bytes freed."""
+        if not self.path.is_dir():
+            return 0
+
+        entries = []
+        total_size = 0
+        for entry in self.path.iterdir():
+            if not entry.is_dir():
+                continue
+            size = sum(x.stat().st_size for x in entry.iterdir() if x.is_file())
+            entries.append((entry.stat().st_mtime, size, entry))
+            total_size += size
+
+        freed = 0
+        for _, size, entry in sorted(entries, key=lambda x: x[0]):
+            if total_size - freed <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            freed += size
+
+        return freed
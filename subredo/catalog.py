@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from subredo.planner import get_plan
+from subredo.videoredoproject import VideoReDoProject
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    source TEXT,
+    duration INTEGER,
+    cut_count INTEGER,
+    kept_duration INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    output TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_status ON projects (status);
+"""
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+INVALID = "invalid"
+
+
+class Catalog:
+    """
+    SQLite-backed Catalog of Project files and their processing status.
+
+    Scanning a folder only parses Project files that are new or whose modification
+    time or size changed since the last scan, and any change marks the Project as
+    pending again. Everything else is answered from the database.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self) -> Catalog:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def scan(self, folder: Path) -> dict[str, int]:
+        """
+        Recursively scan a folder for Project files and update the Catalog.
+
+        Returns the amount of Project files that were added, updated, unchanged,
+        and removed, as they no longer exist.
+        """
+        prefix = os.path.join(str(folder.resolve()), "")
+        known = {
+            row["path"]: (row["mtime_ns"], row["size"])
+            for row in self.db.execute(
+                "SELECT path, mtime_ns, size FROM projects WHERE substr(path, 1, length(?)) = ?",
+                (prefix, prefix)
+            )
+        }
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+
+        seen = set()
+        with self.db:
+            for root, _, files in os.walk(folder):
+                for name in files:
+                    if not name.lower().endswith(".vprj"):
+                        continue
+                    path = Path(root, name).resolve()
+                    stat = path.stat()
+                    seen.add(str(path))
+                    previous = known.get(str(path))
+                    if previous == (stat.st_mtime_ns, stat.st_size):
+                        counts["unchanged"] += 1
+                        continue
+                    self._update(path, stat.st_mtime_ns, stat.st_size)
+                    counts["updated" if previous else "added"] += 1
+
+            for path in set(known) - seen:
+                self.db.execute("DELETE FROM projects WHERE path = ?", (path,))
+                counts["removed"] += 1
+
+        return counts
+
+    def _update(self, path: Path, mtime_ns: int, size: int) -> None:
+        try:
+            project = VideoReDoProject.load_file(path)
+        except Exception as e:
+            self.db.execute(
+                "INSERT OR REPLACE INTO projects (path, mtime_ns, size, status, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), mtime_ns, size, INVALID, str(e), time.time())
+            )
+            return
+        self.db.execute(
+            "INSERT OR REPLACE INTO projects "
+            "(path, mtime_ns, size, source, duration, cut_count, kept_duration, status, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(path), mtime_ns, size, str(project.filename), project.duration, len(project.cut_list),
+                get_plan(project).kept_duration, PENDING, time.time()
+            )
+        )
+
+    def set_status(self, path: Path, status: str, output: Optional[Path] = None, error: Optional[str] = None) -> None:
+        """Record the processing status of a Project."""
+        with self.db:
+            self.db.execute(
+                "UPDATE projects SET status = ?, output = ?, error = ?, updated = ? WHERE path = ?",
+                (status, str(output) if output else None, error, time.time(), str(path.resolve()))
+            )
+
+    def query(self, status: Optional[str] = None) -> list[sqlite3.Row]:
+        """Get the Projects in the Catalog, optionally only those with a specific status."""
+        if status:
+            return self.db.execute("SELECT * FROM projects WHERE status = ? ORDER BY path", (status,)).fetchall()
+        return self.db.execute("SELECT * FROM projects ORDER BY path").fetchall()
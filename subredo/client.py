@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_PORT = 8470
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+
+
+class ClientError(Exception):
+    """The job server could not be reached, or refused a request."""
+
+
+class Client:
+    """
+    A client of a job server started with `subredo serve`, see subredo.server.JobServer.
+
+    Jobs are returned as the server's JSON data. Project and Cut Video paths are made
+    absolute, as the server does not share the client's working directory.
+    """
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 10.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        # the server is local, a proxy set in the environment would not reach it
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def submit(self, project: Path, cut_video: Optional[Path] = None, **options: Any) -> dict[str, Any]:
+        """Submit a Project with Job options overriding the server's, e.g. offset=100."""
+        data = {"project": str(project.resolve()), **options}
+        if cut_video:
+            data["cut_video"] = str(cut_video.resolve())
+        return self._request("POST", "/jobs", data)
+
+    def get_jobs(self) -> list[dict[str, Any]]:
+        """Get all Jobs, in the order they were submitted."""
+        return self._request("GET", "/jobs")
+
+    def get_job(self, id_: int) -> dict[str, Any]:
+        """Get a Job, with the most recent lines of its output."""
+        return self._request("GET", f"/jobs/{id_}")
+
+    def cancel(self, id_: int) -> dict[str, Any]:
+        """Cancel a Job that did not start yet."""
+        return self._request("DELETE", f"/jobs/{id_}")
+
+    def _request(self, method: str, path: str, data: Any = None) -> Any:
+        request = urllib.request.Request(
+            self.url + path,
+            data=json.dumps(data).encode("utf8") if data is not None else None,
+            headers={"Content-Type": "application/json"},
+            method=method
+        )
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read())["error"]
+            except (ValueError, KeyError, TypeError):
+                message = str(e)
+            raise ClientError(message) from e
+        except urllib.error.URLError as e:
+            raise ClientError(f"Unable to reach the job server at {self.url}, is it running? {e.reason}") from e
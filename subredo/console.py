@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+import sys
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table as RichTable
+
+# what rich takes as markup, e.g. [bold red] or [/], but not [ERROR] or [1/2]
+MARKUP = re.compile(r"(?<!\\)\[[a-z#/@][^[]*?]")
+# emoji codes, e.g. :tada:, as a word of their own
+EMOJI = re.compile(r"(?<!\S):[a-z_]+:(?:\s+|$)")
+
+
+def strip_markup(text: str) -> str:
+    """Remove rich's markup and emoji codes from text."""
+    return EMOJI.sub("", MARKUP.sub("", text))
+
+
+class Table:
+    """
+    A table of text, printed as a rich Table, or as tab-separated plain text.
+
+    Takes the same arguments as the parts of rich's Table that are used, without
+    importing rich until it's printed with a rich Console.
+    """
+    def __init__(self, title: Optional[str] = None):
+        self.title = title
+        self.columns: list[tuple[str, dict[str, Any]]] = []
+        self.rows: list[tuple[str, ...]] = []
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def add_column(self, header: str, **options: Any) -> None:
+        self.columns.append((header, options))
+
+    def add_row(self, *cells: str) -> None:
+        self.rows.append(cells)
+
+    def __rich__(self) -> RichTable:
+        from rich.table import Table as RichTable
+        table = RichTable(title=self.title)
+        for header, options in self.columns:
+            table.add_column(header, **options)
+        for row in self.rows:
+            table.add_row(*row)
+        return table
+
+    def __str__(self) -> str:
+        lines = [self.title] if self.title else []
+        lines.append("\t".join(header for header, _ in self.columns))
+        lines.extend("\t".join(strip_markup(cell) for cell in row) for row in self.rows)
+        return "\n".join(lines)
+
+
+class _Status:
+    def update(self, status: str) -> None:
+        pass
+
+
+class PlainConsole:
+    """
+    A stand-in for rich's Console printing plain text, for logs and scripts.
+
+    Markup is removed, tables are tab-separated, and statuses are not shown.
+    """
+    def __init__(self, quiet: bool = False, file: Optional[TextIO] = None):
+        self.quiet = quiet
+        self.file = file
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", markup: Optional[bool] = None) -> None:
+        if self.quiet:
+            return
+        text = sep.join(str(x) if isinstance(x, Table) or markup is False else strip_markup(str(x)) for x in objects)
+        print(text, end=end, file=self.file or sys.stdout, flush=True)
+
+    @contextmanager
+    def status(self, status: str) -> Iterator[_Status]:
+        yield _Status()
+
+
+AnyConsole = Union["Console", PlainConsole]
+
+
+def get_console(plain: bool = False, quiet: bool = False) -> AnyConsole:
+    """Get a rich Console, or a PlainConsole if plain, which does not import rich."""
+    if plain:
+        return PlainConsole(quiet=quiet)
+    from rich.console import Console
+    return Console(quiet=quiet)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import mmap
+import re
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from subredo.srt import Cue
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import TICKS_PER_MS, Timestamp
+
+# a SubRip timing line, at the start of a line, up to its line break
+TIMING = re.compile(
+    rb"^[ \t]*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})[ \t]*-->[ \t]*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})[^\r\n]*",
+    re.MULTILINE
+)
+# the line break ending a block of lines, i.e. followed by a blank or whitespace-only line
+BLOCK_END = re.compile(rb"\n[ \t\r]*(?:\n|$)")
+LINE_BREAK = re.compile(rb"\r?\n")
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+def _get_ticks(hours: bytes, minutes: bytes, seconds: bytes, fraction: bytes) -> int:
+    return (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000 * TICKS_PER_MS + \
+        int(fraction) * 10 ** (7 - len(fraction))
+
+
+def _format_ticks(ticks: int) -> bytes:
+    seconds, ms = divmod(ticks // TICKS_PER_MS, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return b"%02d:%02d:%02d,%03d" % (hours, minutes, seconds, ms)
+
+
+class CueStore:
+    """
+    A compact, columnar store of SubRip Cues, for very large Subtitle tracks.
+
+    Each Cue is four integers in flat arrays, its start and end in ticks, and the start
+    and end of its text in a single UTF-8 buffer. That's 32 bytes per Cue plus its text,
+    instead of a Cue object with a Timestamp and string for each field. The buffer may
+    be a SubRip file memory-mapped with load(), where the text of each Cue is read from
+    in place, so it's only ever paged in, never copied.
+
+    Slicing, shifting, and cutting make a new CueStore with new timing arrays that share
+    the text offsets and buffer, without making an object per Cue. Cues are materialized
+    one at a time only when iterated. A CueStore's arrays are not to be modified, as
+    they may be shared with others.
+    """
+    __slots__ = ("buffer", "starts", "ends", "text_starts", "text_ends", "_max_duration")
+
+    def __init__(
+        self, buffer: Buffer = b"", starts: Optional[array] = None, ends: Optional[array] = None,
+        text_starts: Optional[array] = None, text_ends: Optional[array] = None
+    ):
+        self.buffer = buffer
+        self.starts = starts if starts is not None else array("q")
+        self.ends = ends if ends is not None else array("q")
+        self.text_starts = text_starts if text_starts is not None else array("q")
+        self.text_ends = text_ends if text_ends is not None else array("q")
+        self._max_duration: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Cue:
+        """Get a Cue, numbered by its position in the store."""
+        if i < 0:
+            i += len(self)
+        return Cue(i + 1, Timestamp(self.starts[i]), Timestamp(self.ends[i]), self.get_text(i))
+
+    def __iter__(self) -> Iterator[Cue]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __enter__(self) -> CueStore:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the memory-mapped file, if any. Its text, and that of any CueStore made from it, is then unavailable."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def get_text(self, i: int) -> str:
+        """Get the text of a Cue, with Unix line breaks."""
+        return self._get_text_bytes(i).decode("utf8", "replace")
+
+    def _get_text_bytes(self, i: int) -> bytes:
+        text = self.buffer[self.text_starts[i]:self.text_ends[i]]
+        if b"\r" in text:
+            text = text.replace(b"\r\n", b"\n")
+        return text
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[Cue]) -> CueStore:
+        """Make a CueStore of Cues, e.g. as they are streamed from srt.read(). Their text is copied into a new buffer."""
+        store = cls(bytearray())
+        for cue in cues:
+            text = cue.text.encode("utf8")
+            store.starts.append(cue.start.ticks)
+            store.ends.append(cue.end.ticks)
+            store.text_starts.append(len(store.buffer))
+            store.buffer += text
+            store.text_ends.append(len(store.buffer))
+        return store
+
+    @classmethod
+    def parse(cls, data: Buffer) -> CueStore:
+        """
+        Parse SubRip (SRT) data into a CueStore, with the data as its buffer.
+
+        Parsed like srt.iter_cues(): a Cue's text is every line after its timing line up to
+        a blank line, and blocks without a timing line are skipped. A UTF-8 Byte-Order-Mark
+        is ignored.
+        """
+        store = cls(data)
+        starts, ends, text_starts, text_ends = store.starts, store.ends, store.text_starts, store.text_ends
+        position = 3 if data[:3] == b"\xef\xbb\xbf" else 0
+        while True:
+            match = TIMING.search(data, position)
+            if not match:
+                break
+            starts.append(_get_ticks(*match.group(1, 2, 3, 4)))
+            ends.append(_get_ticks(*match.group(5, 6, 7, 8)))
+            line_break = LINE_BREAK.match(data, match.end())
+            text_start = line_break.end() if line_break else match.end()
+            block_end = BLOCK_END.search(data, match.end())
+            if block_end:
+                text_end, position = block_end.start(), block_end.end()
+            else:
+                text_end = position = len(data)
+            while text_end > text_start and data[text_end - 1] in b"\r\n":
+                text_end -= 1
+            text_starts.append(text_start)
+            text_ends.append(max(text_end, text_start))
+        return store
+
+    @classmethod
+    def load(cls, path: Path) -> CueStore:
+        """
+        Memory-map a SubRip (SRT) file into a CueStore, see parse().
+
+        Close it when done, e.g. by using it as a context manager, as the file can not be
+        deleted while it's mapped on Windows.
+        """
+        with open(path, "rb") as f:
+            try:
+                data: Buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b""  # empty files can't be mapped
+        return cls.parse(data)
+
+    def _select(self, indexes: Iterable[int]) -> CueStore:
+        """Make a CueStore of the Cues at the indexes, sharing the buffer."""
+        store = CueStore(self.buffer)
+        for i in indexes:
+            store.starts.append(self.starts[i])
+            store.ends.append(self.ends[i])
+            store.text_starts.append(self.text_starts[i])
+            store.text_ends.append(self.text_ends[i])
+        return store
+
+    def slice(self, start: int, end: int) -> CueStore:
+        """
+        Get the Cues overlapping a time range in ticks, as they are, without trimming them.
+
+        Cues must be in time order, as they are in SubRip files, see sort(). Only the Cues
+        that may overlap are looked at, found with a binary search.
+        """
+        starts, ends = self.starts, self.ends
+        if self._max_duration is None:
+            self._max_duration = max(max(map(int.__sub__, ends, starts), default=0), 0)
+        first = bisect_left(starts, start - self._max_duration)
+        last = bisect_left(starts, end)
+        return self._select(i for i in range(first, last) if ends[i] > start)
+
+    def sort(self) -> CueStore:
+        """Get the Cues in time order, by start then end."""
+        starts, ends = self.starts, self.ends
+        return self._select(sorted(range(len(self)), key=lambda i: (starts[i], ends[i])))
+
+    def shift(self, ticks: int) -> CueStore:
+        """Move every Cue by an amount of ticks, earlier if negative. Cues are not moved before 0."""
+        store = CueStore(self.buffer, text_starts=self.text_starts, text_ends=self.text_ends)
+        store.starts = array("q", (max(0, x + ticks) for x in self.starts))
+        store.ends = array("q", (max(0, x + ticks) for x in self.ends))
+        return store
+
+    def cut(self, timeline: TimelineMapper) -> CueStore:
+        """
+        Apply Cuts to the Cues, keeping only what's within the kept segments, like srt.cut().
+
+        A Cue spanning a cut is split into one Cue per kept segment, each sharing the
+        original's text.
+        """
+        store = CueStore(self.buffer)
+        starts, ends, text_starts, text_ends = store.starts, store.ends, store.text_starts, store.text_ends
+        map_range = timeline.map_range_ticks
+        for cue_start, cue_end, text_start, text_end in zip(self.starts, self.ends, self.text_starts, self.text_ends):
+            for start, end in map_range(cue_start, cue_end):
+                starts.append(start)
+                ends.append(end)
+                text_starts.append(text_start)
+                text_ends.append(text_end)
+        return store
+
+    def write(self, path: Path) -> int:
+        """
+        Write the Cues to a SubRip (SRT) file as UTF-8 (no BOM), re-numbered, like srt.write().
+
+        Nothing is written if there are no Cues. Returns the amount of Cues written.
+        """
+        if not len(self):
+            return 0
+        with open(path, "wb") as f:
+            f.writelines(
+                b"%s%d\n%s --> %s\n%s\n" % (
+                    b"\n" if i else b"", i + 1, _format_ticks(start), _format_ticks(end), self._get_text_bytes(i)
+                )
+                for i, (start, end) in enumerate(zip(self.starts, self.ends))
+            )
+        return len(self)
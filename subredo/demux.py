@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from typing import Iterator
+
+from subredo import matroska, pgs, srt
+from subredo.timestamp import Timestamp
+
+# Subtitle formats (as named by MediaInfo) that can be demuxed natively, and their Matroska Codec ID
+FORMATS = {
+    "UTF-8": "S_TEXT/UTF8",
+    "PGS": "S_HDMV/PGS"
+}
+
+
+def iter_cues(data: mmap.mmap, blocks: list[matroska.Block], track: matroska.Track) -> Iterator[srt.Cue]:
+    for i, block in enumerate(blocks):
+        start = Timestamp(block.timestamp // 100)
+        if block.duration is not None:
+            end = Timestamp((block.timestamp + block.duration) // 100)
+        elif i + 1 < len(blocks):
+            # without a duration, a caption is shown until the next one
+            end = Timestamp(blocks[i + 1].timestamp // 100)
+        else:
+            end = start
+        text = matroska.read_frame(data, block, track).decode("utf8", "replace")
+        text = text.replace("\r\n", "\n").strip("\n")
+        if text.strip():
+            yield srt.Cue(index=i + 1, start=start, end=end, text=text)  # re-numbered when read
+
+
+def iter_display_sets(data: mmap.mmap, blocks: list[matroska.Block], track: matroska.Track) -> Iterator[pgs.DisplaySet]:
+    for block in blocks:
+        # Matroska stores the PGS segments of a Display Set without their headers' magic and timestamps
+        frame = matroska.read_frame(data, block, track)
+        pts = block.timestamp * 9 // 100000
+        segments = []
+        offset = 0
+        while offset + 3 <= len(frame):
+            type_ = frame[offset]
+            size = int.from_bytes(frame[offset + 1:offset + 3], "big")
+            segments.append(pgs.Segment(pts=pts, dts=0, type_=type_, data=frame[offset + 3:offset + 3 + size]))
+            offset += 3 + size
+        if segments:
+            yield pgs.DisplaySet(segments)
+
+
+def extract_subtitles(video_path: Path, outputs: dict[int, Path]) -> None:
+    """
+    Extract Subtitle tracks from a Matroska file without FFmpeg.
+
+    Outputs are keyed by Track number. Text tracks are written as SubRip (.srt) and
+    PGS tracks as .sup, the same as FFmpeg would extract them. Only the headers of
+    the file and the Clusters holding Subtitle Blocks are read, skipping over the
+    video and audio data, see matroska.iter_blocks.
+
+    Raises a ValueError if the file is not Matroska, or any of the tracks can't be
+    demuxed natively, in which case they should be extracted with FFmpeg instead.
+    """
+    with open(video_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header = matroska.read_header(data)
+        tracks = {track.number: track for track in header.tracks}
+        for number in outputs:
+            track = tracks.get(number)
+            if not track or track.codec_id not in FORMATS.values():
+                raise ValueError(f"Track {number} can't be demuxed natively")
+            if track.encrypted:
+                raise ValueError(f"Track {number} is encrypted")
+
+        blocks: dict[int, list[matroska.Block]] = {number: [] for number in outputs}
+        for block in matroska.iter_blocks(data, header, set(outputs)):
+            blocks[block.track].append(block)
+
+        for number, path in outputs.items():
+            track = tracks[number]
+            if track.codec_id == FORMATS["UTF-8"]:
+                srt.write(path, iter_cues(data, blocks[number], track))
+            else:
+                pgs.write(path, iter_display_sets(data, blocks[number], track))
+            # an empty track still gets a file, like FFmpeg makes
+            path.touch()
+
+
+def get_cue_ranges(video_path: Path, track_numbers: set[int]) -> dict[int, list[tuple[int, int]]]:
+    """
+    Get the time range in ticks of every Block of Subtitle tracks of a Matroska file.
+
+    Only Block headers are read, never their frame data, so it's far cheaper than
+    extracting the tracks. A Block without a duration lasts until the next Block of
+    its track, as it does when extracted. Raises a ValueError if the file is not
+    Matroska, or its Blocks can't be read.
+    """
+    with open(video_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header = matroska.read_header(data)
+            blocks: dict[int, list[matroska.Block]] = {number: [] for number in track_numbers}
+            for block in matroska.iter_blocks(data, header, track_numbers):
+                blocks[block.track].append(block)
+
+    ranges: dict[int, list[tuple[int, int]]] = {}
+    for number, track_blocks in blocks.items():
+        ranges[number] = []
+        for i, block in enumerate(track_blocks):
+            if block.duration is not None:
+                end = block.timestamp + block.duration
+            elif i + 1 < len(track_blocks):
+                end = track_blocks[i + 1].timestamp
+            else:
+                end = block.timestamp
+            ranges[number].append((block.timestamp // 100, end // 100))
+    return ranges
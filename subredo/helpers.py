@@ -1,91 +1,150 @@
-import subprocess
-from pathlib import Path
-
-from subredo.timestamp import Timestamp
-
-
-class Subtitle:
-    """Generic data container for Subtitles."""
-    def __init__(
-        self, path: Path, name: str, language: str, forced: bool,
-        default: bool, sdh: bool, original_lang: bool
-    ):
-        self.path = path
-        self.name = name
-        self.language = language
-        self.forced = forced
-        self.default = default
-        self.sdh = sdh
-        self.original_lang = original_lang
-
-
-def cut_subtitle(video_path: Path, out_path: Path, sub_id: int, start: Timestamp, end: Timestamp) -> int:
-    """
-    Trim/Cut the Subtitle track to only the Start to End timestamps.
-
-    Note: FFMPEG will offset all output caption timestamps at `00:00:00.000`.
-          You may want to also use offset_subtitle().
-    """
-    return subprocess.check_call([
-        "ffmpeg",
-        "-y",
-        "-hide_banner",
-        "-loglevel", "error",
-        "-i", video_path,
-        "-map", f"0:s:{sub_id}",
-        "-ss", str(start),
-        "-to", str(end),
-        out_path
-    ])
-
-
-def offset_subtitle(subtitle_path: Path, offset: Timestamp) -> int:
-    """Offset Timestamps of Subtitle Captions in-place."""
-    if subtitle_path.stat().st_size == 0:
-        # nothing to offset and SubtitleEdit complains
-        return 0
-    res = subprocess.check_call([
-        "SubtitleEdit",
-        "/convert", subtitle_path,
-        "srt",
-        f"/offset:{str(offset).replace('.', ':')}",
-        "/encoding:utf8",
-        "/overwrite"
-    ], stdout=subprocess.DEVNULL)
-    remove_utf8_bom(subtitle_path)
-    return res
-
-
-def remove_utf8_bom(file: Path) -> None:
-    """Remove Byte-Order-Marks from UTF-8 file."""
-    file.write_text(
-        file.read_text(encoding="utf-8-sig"),
-        encoding="utf8"
-    )
-
-
-def mux_subtitles(video_path: Path, out_path: Path, subtitles: list[Subtitle]) -> int:
-    """Mux one or more Subtitles into an MKV container."""
-    cli = [
-        "mkvmerge",
-        video_path,
-        "-o", out_path
-    ]
-
-    for subtitle in subtitles:
-        if not subtitle.path.exists():
-            # sub track only had captions in the now deleted segments
-            continue
-        cli.extend([
-            "--track-name", f"0:{subtitle.name or ''}",
-            "--language", f"0:{subtitle.language}",
-            "--sub-charset", "0:UTF-8",
-            "--forced-track", f"0:{subtitle.forced}",
-            "--default-track", f"0:{subtitle.default}",
-            "--hearing-impaired-flag", f"0:{subtitle.sdh}",
-            "--original-flag", f"0:{subtitle.original_lang}",
-            "--compression", "0:none",  # disable extra compression (probably zlib)
-            "(", str(subtitle.path), ")"
-        ])
-
-    return subprocess.check_call(cli)
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Sequence, Union
+
+from subredo.runner import Job
+from subredo.timestamp import Timestamp
+
+# Image-based Subtitle formats (as named by MediaInfo) and the file extension to extract them to.
+# PGS is cut natively, the others are passed through in a Matroska Subtitle file (.mks).
+BITMAP_FORMATS = {
+    "PGS": ".sup",
+    "VobSub": ".mks",
+    "DVB Subtitle": ".mks"
+}
+
+
+class Subtitle:
+    """Generic data container for Subtitles."""
+    def __init__(
+        self, path: Path, name: str, language: str, forced: bool,
+        default: bool, sdh: bool, original_lang: bool, delay: int = 0
+    ):
+        self.path = path
+        self.name = name
+        self.language = language
+        self.forced = forced
+        self.default = default
+        self.sdh = sdh
+        self.original_lang = original_lang
+        self.delay = delay
+
+
+def get_extension(format_: str) -> str:
+    """Get the file extension to extract a Subtitle track to by its MediaInfo format."""
+    return BITMAP_FORMATS.get(format_, ".srt")
+
+
+def extract_subtitles(video_path: Path, outputs: dict[int, Path]) -> Job:
+    """
+    Extract one or more Subtitle tracks from the Video.
+
+    The outputs map each Subtitle stream index to the path it should be extracted to.
+    Tracks extracted to SubRip (.srt) are converted, while image-based tracks are
+    copied as-is without decoding. All tracks are extracted in a single pass, so the
+    Video is only read once. The captions are kept at their original timestamps, no
+    cuts are made.
+    """
+    cli = [
+        "ffmpeg",
+        "-y",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-i", video_path
+    ]
+
+    for sub_id, out_path in outputs.items():
+        cli.extend([
+            "-map", f"0:s:{sub_id}",
+            "-c:s", "srt" if out_path.suffix == ".srt" else "copy",
+            out_path
+        ])
+
+    return Job("Extract Subtitles", cli)
+
+
+def get_split_parts(segments: list[tuple[Timestamp, Timestamp]]) -> str:
+    """Get an mkvmerge split argument that keeps the segments, linking them one after another."""
+    parts = ",".join(
+        f"{'+' if i else ''}{a}-{b}"
+        for i, (a, b) in enumerate(segments)
+    )
+    return f"parts:{parts}"
+
+
+def split_parts(in_path: Path, out_path: Path, segments: list[tuple[Timestamp, Timestamp]]) -> Job:
+    """
+    Cut a Matroska file to the segments, linking them one after another in a single file.
+
+    The data is passed through as-is, so any codec can be cut without decoding it.
+    """
+    return Job("Split Subtitle", [
+        "mkvmerge",
+        "-o", out_path,
+        "--split", get_split_parts(segments),
+        in_path
+    ])
+
+
+def identify(video_path: Path) -> list[dict]:
+    """Get the Tracks of a Video as mkvmerge identifies them, in mkvmerge's Track ID order."""
+    output = subprocess.run(
+        ["mkvmerge", "-J", str(video_path)],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=True
+    ).stdout
+    return json.loads(output)["tracks"]
+
+
+def export_cut(
+    video_path: Path, out_path: Path, segments: list[tuple[Timestamp, Timestamp]],
+    track_options: Sequence[Union[str, Path]] = ()
+) -> Job:
+    """
+    Export the segments of a Video to MKV in a single pass, linking them one after another.
+
+    All tracks, including Subtitles, are stream-copied and cut at the same time, so
+    nothing is re-encoded. Video can only be cut on key-frames, so the segment
+    boundaries move to the nearest key-frame. The track options apply to the Video's
+    tracks by their mkvmerge Track ID, see identify().
+    """
+    return Job("Export Cut Video", [
+        "mkvmerge",
+        "-o", out_path,
+        "--split", get_split_parts(segments),
+        *track_options,
+        video_path
+    ], progress=re.compile(r"Progress: (\d+)%"))
+
+
+def mux_subtitles(video_path: Path, out_path: Path, subtitles: list[Subtitle]) -> Job:
+    """Mux one or more Subtitles into an MKV container."""
+    cli = [
+        "mkvmerge",
+        video_path,
+        "-o", out_path
+    ]
+
+    for subtitle in subtitles:
+        if not subtitle.path.exists():
+            # sub track only had captions in the now deleted segments
+            continue
+        cli.extend([
+            "--track-name", f"0:{subtitle.name or ''}",
+            "--language", f"0:{subtitle.language}",
+            "--forced-track", f"0:{subtitle.forced}",
+            "--default-track", f"0:{subtitle.default}",
+            "--hearing-impaired-flag", f"0:{subtitle.sdh}",
+            "--original-flag", f"0:{subtitle.original_lang}",
+            "--compression", "0:none",  # disable extra compression (probably zlib)
+        ])
+        if subtitle.path.suffix == ".srt":
+            cli.extend(["--sub-charset", "0:UTF-8"])
+        if subtitle.delay:
+            cli.extend(["--sync", f"0:{subtitle.delay}"])
+        cli.extend(["(", str(subtitle.path), ")"])
+
+    return Job("Mux Subtitles", cli, progress=re.compile(r"Progress: (\d+)%"))
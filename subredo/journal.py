@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# the stages of processing a Project that are recorded, in order
+EXPORT = "export"
+DONE = "done"
+
+
+class Journal:
+    """
+    Append-only journal of the completed stages of processing Projects, for resuming batches.
+
+    Each line is a JSON object recording a stage of a Project that completed, with the
+    fingerprint of its inputs, and the path, size, and modification time of its output.
+    Lines are appended with a single write and synced to disk before the next stage
+    starts, so a crash or reboot loses at most the stage that was running. A truncated
+    line, from a crash mid-write, is ignored, and the next entry starts on a new line.
+
+    Any amount of processes can append to the same Journal, e.g. Batch mode workers.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[tuple[str, str], dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Read the Journal's entries, keeping the last entry of each stage of each Project."""
+        self.entries.clear()
+        try:
+            f = open(self.path, encoding="utf8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.entries[(entry["project"], entry["stage"])] = entry
+
+    def record(self, project: Path, stage: str, fingerprint: str, output: Path) -> None:
+        """Record that a stage of a Project completed, writing output from inputs with the fingerprint."""
+        stat = output.stat()
+        entry = {
+            "time": time.time(),
+            "project": str(project.resolve()),
+            "stage": stage,
+            "fingerprint": fingerprint,
+            "output": str(output.resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns
+        }
+        line = (json.dumps(entry) + "\n").encode("utf8")
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            if os.lseek(fd, 0, os.SEEK_END):
+                os.lseek(fd, -1, os.SEEK_END)
+                if os.read(fd, 1) != b"\n":
+                    # end the truncated last line of a crash mid-write, so this entry is on a line of its own
+                    line = b"\n" + line
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.entries[(entry["project"], stage)] = entry
+
+    def get(self, project: Path, stage: str, fingerprint: str) -> Optional[Path]:
+        """
+        Get the output of a completed stage of a Project, if its inputs are unchanged.
+
+        The output is checked cheaply, by its size and modification time only, so it's
+        not used if it was since modified, replaced, or deleted.
+        """
+        entry = self.entries.get((str(project.resolve()), stage))
+        if not entry or entry["fingerprint"] != fingerprint:
+            return None
+        output = Path(entry["output"])
+        try:
+            stat = output.stat()
+        except OSError:
+            return None
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime"]:
+            return None
+        return output
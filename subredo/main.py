@@ -1,198 +1,722 @@
-from __future__ import annotations
-
-import math
-import platform
-import shutil
-import sys
-import tempfile
-import time
-from pathlib import Path
-from typing import Optional
-
-import click
-from rich.status import Status
-from rich import print
-from pymediainfo import MediaInfo
-from rich.table import Table
-
-from subredo.helpers import mux_subtitles, Subtitle, offset_subtitle, cut_subtitle
-from subredo.timestamp import Timestamp
-from subredo.videoredoproject import VideoReDoProject
-
-
-@click.command()
-@click.argument("projects", type=Path, nargs=-1)
-@click.option("-o", "--original-language", type=str, default="en",
-              help="Declare the Original Language for this Video's Subtitle flags.")
-@click.option("-c", "--cut-video", type=Path, default=None,
-              help="Specify manually exported cut video from the VideoReDo project file to mux the Subtitles to."
-                   "Otherwise, On Windows a new MKV will be automatically exported next to the project file.")
-@click.option("-k", "--keep-cut", is_flag=True, default=False,
-              help="Keep the original Cut Video after multiplexing a Cut Video with the Subtitles.")
-@click.option("-o", "--offset", type=int, default=0,
-              help="Initial Subtitle Sync adjustment offset in milliseconds. Must be 0 or greater.")
-def main(projects: list[Path], original_language: str, cut_video: Optional[Path], keep_cut: bool, offset: int):
-    """
-    Apply Cuts from a VideoReDo Project File on Subtitles.
-
-    \b
-    PROJECTS    One or more VideoReDo project files (.Vprj) to read and apply cuts from.
-                You can alternatively specify a folder to search for .Vprj files from.
-                Subtitles are read from the source file of each project.
-    """
-    project_files = [
-        project_file
-        for x in projects
-        for project_file in (x.glob("*.Vprj") if x.is_dir() else [x])
-    ]
-
-    cut_video_ = cut_video
-
-    if cut_video and len(project_files) > 1:
-        print("[Error]: Batch mode does not support -c/--cut-video.")
-        sys.exit(1)
-
-    for project in project_files:
-        print(f"Processing {project.name}")
-
-        video_redo_project = VideoReDoProject.loads(project.read_text(encoding="utf8"))
-        subs_folder = Path("subs")
-        cut_video = cut_video_
-
-        mediainfo = MediaInfo.parse(video_redo_project.filename)
-        video_track = mediainfo.video_tracks[0]
-        subtitles = mediainfo.text_tracks
-
-        duration = Timestamp.from_milliseconds(video_redo_project.duration / 10000)
-        fps = int(video_track.framerate_num) / int(video_track.framerate_den)
-        frame_time_ms = (1 / fps) * 1000
-        frame_time_ms_int = math.ceil(frame_time_ms)
-
-        keep_timestamps = []
-        elapsed = Timestamp.from_milliseconds(0)
-
-        if not cut_video:
-            if platform.system() == "Windows":
-                from subredo.videoredocom import VideoReDo
-                with Status("Exporting the VideoReDo Project to MKV...") as status:
-                    cut_video = project.with_stem(f"{project.stem} (SubReDo)").with_suffix(".mkv")
-                    vrd = VideoReDo()
-                    if not vrd.file_open(project):
-                        raise ValueError(f"Failed to open Project File \"{project}\"")
-                    if not vrd.file_save_as(cut_video, "Matroska MKV"):
-                        raise ValueError(f"Failed to save Video to \"{cut_video}\"")
-                    while vrd.vrd.OutputGetState != 0:
-                        status.update(f"Exporting the VideoReDo Project to MKV ({vrd.output_get_percent_complete:.2f}%)...")
-                        time.sleep(0.2)
-            else:
-                cut_video = project.with_suffix(".mkv")
-                if not cut_video.exists():
-                    print("[ERROR]: Unable to automatically determine the path to the Cut Video export.")
-                    sys.exit(1)
-
-        cuts_table = Table(title="Project Segments")
-        cuts_table.add_column("#", justify="right", style="cyan", no_wrap=True)
-        cuts_table.add_column("Start", style="magenta")
-        cuts_table.add_column("End", style="magenta")
-        cuts_table.add_column("Difference", justify="right", style="green")
-
-        segment_i = 0
-        if video_redo_project.cut_mode:
-            # TODO: Seems to be used even in Scene editing mode?
-            for cut in video_redo_project.cut_list:
-                # the timecodes could be used, but is problematic to get an accurate timestamp
-                cut_start = Timestamp.from_milliseconds((cut.cut_time_start / 10000)) - frame_time_ms
-                cut_end = Timestamp.from_milliseconds((cut.cut_time_end / 10000)) - frame_time_ms
-                cut_duration = cut_end - cut_start
-
-                if cut_start == cut_end:
-                    # it didn't cut away anything duration-wise, likely header data, skip
-                    print(f"Ignoring Cut #{cut.sequence} as it's a duration-less cut and will not affect Subtitles")
-                    continue
-                if cut_duration.total_milliseconds() <= frame_time_ms_int:
-                    # likely some way to "define" a cut between two segments that were kept
-                    # but cutting off one frame for no reason is stupid
-                    continue
-
-                if elapsed < cut_start:
-                    a, b = elapsed + frame_time_ms, cut_start - frame_time_ms
-                    keep_timestamps.append((a, b))
-                    segment_i += 1
-                    cuts_table.add_row(f"{segment_i}", str(a), str(b), f"{b - a}")
-
-                segment_i += 1
-                cuts_table.add_row(f"[bold red]-[/] {segment_i}", str(cut_start), str(cut_end), f"-{cut_duration}")
-
-                elapsed = cut_end
-        else:
-            raise NotImplementedError("Scene Edit Mode is not yet supported...")
-
-        if elapsed + frame_time_ms < duration:
-            segment_i += 1
-            a, b = elapsed + frame_time_ms, duration
-            keep_timestamps.append((a, b))
-            cuts_table.add_row(f"{segment_i}", str(a), str(b), f"{b - a}")
-
-        final_duration = Timestamp.from_milliseconds(0)
-        for a, b in keep_timestamps:
-            final_duration += b - a
-
-        print(cuts_table)
-        print("Final Duration:", final_duration)
-
-        if subs_folder.exists():
-            shutil.rmtree(subs_folder)
-        subs_folder.mkdir(parents=True)
-
-        for sub in subtitles:
-            with Status(f"Processing Subtitle #{int(sub.stream_identifier) + 1} ({sub.language} {sub.title or ''})..."):
-                # Use FFMPEG to make the cuts, use SubEdit to rebase it's offset
-                final_srt_file = subs_folder / f"sub_{sub.track_id}_{sub.language}_{sub.title}_cuts.srt"
-                with tempfile.TemporaryDirectory(prefix="rlaphoenix-subredo") as tmp_dir:
-                    tmp_dir = Path(tmp_dir)
-                    segment_offset = Timestamp.from_milliseconds(offset)
-                    for i, (a, b) in enumerate(keep_timestamps):
-                        sub_file = tmp_dir / f"sub_{sub.track_id}_{sub.language}_{sub.title}_{i}.srt"
-                        cut_subtitle(
-                            video_path=video_redo_project.filename,
-                            out_path=sub_file,
-                            sub_id=sub.stream_identifier,
-                            start=a,
-                            end=b
-                        )
-                        offset_subtitle(sub_file, segment_offset)
-                        segment_offset += (b - a)
-                    merged_srt_data = "\n".join([
-                        srt.read_text(encoding="utf8")
-                        for srt in tmp_dir.glob("*.srt")
-                        if srt.stat().st_size > 0
-                    ])
-                    if len(merged_srt_data) > 0:
-                        final_srt_file.write_text(merged_srt_data, encoding="utf8")
-
-        with Status("Muxing Subtitles to MKV..."):
-            cut_with_subs = cut_video.with_stem(cut_video.stem + " (with Subs)")
-            cut_with_subs.unlink(missing_ok=True)
-            subs = [
-                Subtitle(
-                    path=subs_folder / f"sub_{sub.track_id}_{sub.language}_{sub.title}_cuts.srt",
-                    name=sub.title,
-                    language=sub.language,
-                    forced=sub.forced == "Yes",
-                    default=sub.default == "Yes",
-                    sdh="SDH" in (sub.title or ""),
-                    original_lang=sub.language == original_language
-                )
-                for sub in subtitles
-            ]
-            mux_subtitles(cut_video, cut_with_subs, subs)
-
-        if not keep_cut:
-            cut_video.unlink()
-        shutil.rmtree(subs_folder)
-
-    print(":tada: Done!")
-
-
-if __name__ == "__main__":
-    main()
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import click
+
+from subredo.console import AnyConsole, Table, get_console
+
+if TYPE_CHECKING:
+    from subredo.cache import Cache
+    from subredo.journal import Journal
+    from subredo.trace import Tracer
+
+# Only what's needed to parse the command line is imported here, everything else is imported
+# by the Commands that use it, so short runs and --help start quickly.
+
+
+class DefaultGroup(click.Group):
+    """
+    A Command Group that invokes a default Command unless a Command name is the first argument.
+
+    The Group's own options, which must be flags, may come before the Command name.
+    """
+    def __init__(self, *args, default: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default = default
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        flags = {name for param in self.get_params(ctx) for name in param.opts if name != "--help"}
+        i = 0
+        while i < len(args) and args[i] in flags:
+            i += 1
+        if i == len(args) or (args[i] not in self.commands and args[i] != "--help"):
+            args.insert(i, self.default)
+        return super().parse_args(ctx, args)
+
+
+def split_languages(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[list[str]]:
+    if not value:
+        return None
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+
+def split_track_ids(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[list[int]]:
+    if not value:
+        return None
+    try:
+        return [int(x) for x in value.split(",") if x.strip()]
+    except ValueError:
+        raise click.BadParameter("must be comma-separated Track IDs, e.g. 3,4")
+
+
+def project_options(func):
+    """Options for how Projects are processed, shared by all Commands that process Projects."""
+    options = [
+        click.option("-o", "--original-language", type=str, default="en",
+                     help="Declare the Original Language for this Video's Subtitle flags."),
+        click.option("-k", "--keep-cut", is_flag=True, default=False,
+                     help="Keep the original Cut Video after multiplexing a Cut Video with the Subtitles."),
+        click.option("-o", "--offset", type=int, default=0,
+                     help="Initial Subtitle Sync adjustment offset in milliseconds. Must be 0 or greater."),
+        click.option("-e", "--exporter", type=click.Choice(["videoredo", "mkvmerge"]), default=None,
+                     help="How to export the Cut Video. VideoReDo is frame-accurate, but Windows only. "
+                          "mkvmerge cuts on key-frames, copying all tracks including Subtitles in one pass. "
+                          "Defaults to VideoReDo on Windows, otherwise to mkvmerge unless the Project has an "
+                          "MKV of the same name next to it."),
+        click.option("-l", "--languages", type=str, default=None, callback=split_languages,
+                     help="Only process the Subtitle tracks in these languages, comma-separated, e.g. en,fr. "
+                          "Other tracks are left out of the Cut Video."),
+        click.option("--exclude-tracks", type=str, default=None, callback=split_track_ids,
+                     help="Track IDs of Subtitle tracks to leave out of the Cut Video, comma-separated, as listed "
+                          "in the Subtitle Tracks table."),
+        click.option("--max-procs", type=click.IntRange(min=1), default=None,
+                     help="Maximum amount of external tool processes to run at once for each Project. "
+                          "Defaults to one per CPU."),
+        click.option("--cache-dir", type=Path, default=None,
+                     help="Directory to Cache Source probes and extracted Subtitle tracks to. "
+                          "Defaults to the platform's user cache directory."),
+        click.option("--cache-size", type=click.IntRange(min=0), default=2048,
+                     help="Maximum size of the Cache in MiB. The least recently used Sources are evicted first."),
+        click.option("--no-cache", is_flag=True, default=False,
+                     help="Do not read from or write to the Cache."),
+        click.option("--temp-dir", type=Path, default=None,
+                     help="Directory for temporary files, including the Cut Video export unless it's kept. "
+                          "Defaults to the system's temporary directory."),
+        click.option("--trace", "trace_file", type=Path, default=None,
+                     help="Record the time taken by each stage and external tool to a Chrome trace JSON file, "
+                          "and show a summary of the slowest stages."),
+        click.option("--journal", "journal_file", type=Path, default=None,
+                     help="Record each completed stage of each Project to this append-only journal file, "
+                          "keeping the Cut Video export until the Project is done, see --resume."),
+        click.option("--resume", is_flag=True, default=False,
+                     help="Skip the Projects and Cut Video exports the --journal recorded as completed, "
+                          "as long as their inputs, options, and output files are unchanged.")
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_cache(cache_dir: Optional[Path], cache_size: int, no_cache: bool) -> Optional[Cache]:
+    """Get the Cache to use from the Cache options, if any."""
+    if no_cache:
+        return None
+    from subredo.cache import Cache, get_default_cache_dir
+    return Cache(cache_dir or get_default_cache_dir(), max_size=cache_size * 1024 * 1024)
+
+
+def get_tracer(trace_file: Optional[Path]) -> Optional[Tracer]:
+    """Get a Tracer if a trace file is to be written."""
+    if not trace_file:
+        return None
+    from subredo.trace import Tracer
+    return Tracer()
+
+
+def get_journal(journal_file: Optional[Path], resume: bool, console: AnyConsole) -> Optional[Journal]:
+    """Get the Journal to record to and resume from, if any. Exits if resuming without one."""
+    if resume and not journal_file:
+        console.print("[ERROR]: --resume needs the --journal of the run to resume.")
+        sys.exit(1)
+    if not journal_file:
+        return None
+    from subredo.journal import Journal
+    return Journal(journal_file)
+
+
+def write_trace(tracer: Tracer, path: Path, console: AnyConsole) -> None:
+    """Write the recorded Spans to a Chrome trace file, and print a summary of the slowest stages."""
+    tracer.write(path)
+    console.print(tracer.get_summary())
+    console.print(f"Trace written to {path}")
+
+
+def is_plain() -> bool:
+    """Whether to print plain text, see --plain."""
+    return click.get_current_context().find_root().params["plain"]
+
+
+@click.group(cls=DefaultGroup, default="cut")
+@click.option("--plain", is_flag=True, default=False, envvar="SUBREDO_PLAIN",
+              help="Print plain text without colors or progress, and tables as tab-separated values, "
+                   "e.g. for logs and scripts. Can also be set with the SUBREDO_PLAIN environment variable.")
+def main(plain: bool):
+    """
+    Apply Cuts from VideoReDo Project Files on Subtitles.
+
+    Projects are processed by the `cut` command unless another command is specified.
+    """
+
+
+@main.command()
+@click.argument("projects", type=Path, nargs=-1)
+@click.option("-c", "--cut-video", type=Path, default=None,
+              help="Specify manually exported cut video from the VideoReDo project file to mux the Subtitles to. "
+                   "Otherwise, a new MKV will be automatically exported, see -e/--exporter.")
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1,
+              help="Amount of Projects to process in parallel in Batch mode.")
+@project_options
+def cut(
+    projects: list[Path], original_language: str, cut_video: Optional[Path], keep_cut: bool, offset: int,
+    exporter: Optional[str], jobs: int, max_procs: Optional[int], cache_dir: Optional[Path], cache_size: int, no_cache: bool,
+    temp_dir: Optional[Path], trace_file: Optional[Path], journal_file: Optional[Path], resume: bool,
+    languages: Optional[list[str]], exclude_tracks: Optional[list[int]]
+):
+    """
+    Apply Cuts from a VideoReDo Project File on Subtitles.
+
+    \b
+    PROJECTS    One or more VideoReDo project files (.Vprj) to read and apply cuts from.
+                You can alternatively specify a folder to search for .Vprj files from.
+                Subtitles are read from the source file of each project.
+    """
+    project_files = [
+        project_file
+        for x in projects
+        for project_file in (x.glob("*.Vprj") if x.is_dir() else [x])
+    ]
+
+    console = get_console(is_plain())
+
+    if cut_video and len(project_files) > 1:
+        console.print("[Error]: Batch mode does not support -c/--cut-video.")
+        sys.exit(1)
+
+    from subredo.pipeline import process_projects
+
+    cache = get_cache(cache_dir, cache_size, no_cache)
+    tracer = get_tracer(trace_file)
+    journal = get_journal(journal_file, resume, console)
+
+    results = process_projects(
+        project_files,
+        jobs=jobs,
+        tracer=tracer,
+        plain=is_plain(),
+        cut_video=cut_video,
+        original_language=original_language,
+        keep_cut=keep_cut,
+        offset=offset,
+        exporter=exporter,
+        max_procs=max_procs,
+        cache=cache,
+        temp_dir=temp_dir,
+        journal=journal,
+        resume=resume,
+        languages=languages,
+        exclude_tracks=exclude_tracks
+    )
+
+    if cache:
+        cache.evict()
+
+    if tracer:
+        write_trace(tracer, trace_file, console)
+
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+    console.print(":tada: Done!")
+
+
+@main.command()
+@click.argument("folder", type=Path)
+@click.option("--debounce", type=click.FloatRange(min=0), default=2.0,
+              help="Seconds a Project file must be left unchanged before it's processed.")
+@click.option("--poll", is_flag=True, default=False,
+              help="Poll the folder for changes instead of using inotify. Always done on network filesystems.")
+@click.option("--existing", is_flag=True, default=False,
+              help="Also process the Project files already in the folder when starting.")
+@project_options
+def watch(
+    folder: Path, debounce: float, poll: bool, existing: bool, original_language: str, keep_cut: bool,
+    offset: int, exporter: Optional[str], max_procs: Optional[int], cache_dir: Optional[Path], cache_size: int, no_cache: bool,
+    temp_dir: Optional[Path], trace_file: Optional[Path], journal_file: Optional[Path], resume: bool,
+    languages: Optional[list[str]], exclude_tracks: Optional[list[int]]
+):
+    """
+    Watch a folder and process Project files as they are created or modified.
+
+    \b
+    FOLDER    Folder to watch for VideoReDo project files (.Vprj).
+
+    A Project is only processed again if its cuts, its Source file, or the options changed
+    since it was last processed successfully. Re-saving an unchanged Project does nothing.
+    Uses inotify on Linux, otherwise the folder is polled. Folders on network filesystems,
+    like SMB or NFS shares, are always polled, as inotify does not see the changes made by
+    other machines. With --trace, the trace file is updated after each Project with all
+    Projects processed so far.
+    """
+    console = get_console(is_plain())
+
+    if not folder.is_dir():
+        console.print(f"[ERROR]: The folder \"{folder}\" does not exist.")
+        sys.exit(1)
+
+    from subredo.pipeline import process_project
+    from subredo.videoredoproject import VideoReDoProject
+    from subredo.watch import Watcher, get_fingerprint
+
+    cache = get_cache(cache_dir, cache_size, no_cache)
+    tracer = get_tracer(trace_file)
+    journal = get_journal(journal_file, resume, console)
+    options = dict(
+        original_language=original_language,
+        keep_cut=keep_cut,
+        offset=offset,
+        exporter=exporter,
+        languages=languages,
+        exclude_tracks=exclude_tracks
+    )
+
+    watcher = Watcher(folder, debounce=debounce, poll=poll, existing=existing)
+    console.print(f"Watching {folder} for Project files{' by polling' if watcher.polling else ''}...")
+    fingerprints: dict[Path, str] = {}
+    for project in watcher:
+        try:
+            video_redo_project = VideoReDoProject.load_file(project)
+            fingerprint = get_fingerprint(video_redo_project, options)
+        except Exception as e:
+            # likely still being written to, it'll be picked up on the next change
+            console.print(f"[ERROR]: Failed to read {project.name}, {e}")
+            continue
+        if fingerprints.get(project) == fingerprint:
+            continue
+        console.print(f"Processing {project.name}")
+        try:
+            output = process_project(
+                project, cut_video=None, max_procs=max_procs, cache=cache, temp_dir=temp_dir, plain=is_plain(),
+                tracer=tracer, journal=journal, resume=resume, **options
+            )
+            fingerprints[project] = fingerprint
+            console.print(f"Processed {project.name} to {output.name}")
+        except Exception as e:
+            console.print(f"[ERROR]: Failed to process {project.name}, {e}")
+        if cache:
+            cache.evict()
+        if tracer:
+            tracer.write(trace_file)
+
+
+@main.group()
+def catalog():
+    """Keep a Catalog of Project files in one or more folders and their processing status."""
+
+
+def catalog_option(func):
+    return click.option("--db", type=Path, default=Path("subredo.db"),
+                        help="Path to the Catalog database. Defaults to subredo.db in the current directory.")(func)
+
+
+@catalog.command()
+@click.argument("folders", type=Path, nargs=-1, required=True)
+@catalog_option
+def scan(folders: list[Path], db: Path):
+    """
+    Recursively scan folders for Project files and add them to the Catalog.
+
+    Only Project files that are new or were modified since the last scan are read. Any
+    modified Project is marked as pending again.
+    """
+    from subredo.catalog import Catalog
+
+    console = get_console(is_plain())
+    with Catalog(db) as catalog_:
+        for folder in folders:
+            counts = catalog_.scan(folder)
+            console.print(f"Scanned {folder}: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+@catalog.command(name="list")
+# the Catalog's statuses, listed here so the Catalog is only imported when used
+@click.option("-s", "--status", type=click.Choice(["pending", "done", "failed", "invalid"]), default=None,
+              help="Only list Projects with this status.")
+@catalog_option
+def list_(status: Optional[str], db: Path):
+    """List the Projects in the Catalog."""
+    from subredo.catalog import Catalog, FAILED
+    from subredo.timestamp import Timestamp
+
+    with Catalog(db) as catalog_:
+        rows = catalog_.query(status)
+
+    table = Table(title="Catalog")
+    table.add_column("Project", style="cyan")
+    table.add_column("Source", style="magenta")
+    table.add_column("Cuts", justify="right")
+    table.add_column("Kept", justify="right", style="green")
+    table.add_column("Status")
+    for row in rows:
+        table.add_row(
+            row["path"],
+            row["source"] or "",
+            str(row["cut_count"] or 0),
+            str(Timestamp(row["kept_duration"] or 0)),
+            row["status"] if row["status"] != FAILED else f"[bold red]{row['status']}[/]: {row['error']}"
+        )
+    get_console(is_plain()).print(table)
+
+
+@catalog.command()
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1,
+              help="Amount of Projects to process in parallel.")
+@click.option("--retry", is_flag=True, default=False,
+              help="Also process Projects that previously failed.")
+@catalog_option
+@project_options
+def process(
+    jobs: int, retry: bool, db: Path, original_language: str, keep_cut: bool, offset: int, exporter: Optional[str],
+    max_procs: Optional[int], cache_dir: Optional[Path], cache_size: int, no_cache: bool,
+    temp_dir: Optional[Path], trace_file: Optional[Path], journal_file: Optional[Path], resume: bool,
+    languages: Optional[list[str]], exclude_tracks: Optional[list[int]]
+):
+    """Process the pending Projects in the Catalog, recording the result of each."""
+    from subredo.catalog import Catalog, DONE, FAILED, PENDING
+    from subredo.pipeline import process_projects
+
+    cache = get_cache(cache_dir, cache_size, no_cache)
+    tracer = get_tracer(trace_file)
+    journal = get_journal(journal_file, resume, get_console(is_plain()))
+
+    with Catalog(db) as catalog_:
+        project_files = [Path(row["path"]) for row in catalog_.query(PENDING)]
+        if retry:
+            project_files += [Path(row["path"]) for row in catalog_.query(FAILED)]
+
+        def on_result(project: Path, output: Optional[Path], error: Optional[Exception]) -> None:
+            catalog_.set_status(
+                project, FAILED if error else DONE, output, f"{type(error).__name__}: {error}" if error else None
+            )
+
+        results = process_projects(
+            project_files,
+            jobs=jobs,
+            on_result=on_result,
+            tracer=tracer,
+            plain=is_plain(),
+            cut_video=None,
+            original_language=original_language,
+            keep_cut=keep_cut,
+            offset=offset,
+            exporter=exporter,
+            max_procs=max_procs,
+            cache=cache,
+            temp_dir=temp_dir,
+            journal=journal,
+            resume=resume,
+            languages=languages,
+            exclude_tracks=exclude_tracks
+        )
+
+    if cache:
+        cache.evict()
+
+    if tracer:
+        write_trace(tracer, trace_file, get_console(is_plain()))
+
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+
+@main.command()
+@click.option("--host", type=str, default="127.0.0.1",
+              help="Address to listen on. Defaults to localhost only, as anyone who can connect can submit Projects.")
+@click.option("--port", type=click.IntRange(min=0, max=65535), default=None,
+              help="Port to listen on. Defaults to 8470.")
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1,
+              help="Amount of Projects to process at the same time. Others are queued.")
+@project_options
+def serve(
+    host: str, port: Optional[int], jobs: int, original_language: str, keep_cut: bool, offset: int,
+    exporter: Optional[str], max_procs: Optional[int], cache_dir: Optional[Path], cache_size: int, no_cache: bool,
+    temp_dir: Optional[Path], trace_file: Optional[Path], journal_file: Optional[Path], resume: bool,
+    languages: Optional[list[str]], exclude_tracks: Optional[list[int]]
+):
+    """
+    Run a job server processing Projects submitted with the `client` command.
+
+    The server stays running with everything loaded, i.e. the Cache, and VideoReDo
+    which is otherwise started for each Project, so each Project starts processing
+    right away. The options are the defaults of every submitted Project, some can be
+    set for each submission. With --trace, the trace file is updated after each
+    Project with all Projects processed so far.
+    """
+    from subredo.server import DONE, JobServer, ServerJob
+
+    console = get_console(is_plain())
+    cache = get_cache(cache_dir, cache_size, no_cache)
+    tracer = get_tracer(trace_file)
+    journal = get_journal(journal_file, resume, console)
+
+    def on_done(job: ServerJob) -> None:
+        if job.status == DONE:
+            console.print(f"[Job {job.id}] Processed {job.project.name} to {job.output.name}")
+        else:
+            console.print(f"[Job {job.id}] [ERROR]: Failed to process {job.project.name}, {job.error}")
+        if tracer:
+            tracer.write(trace_file)
+
+    try:
+        server = JobServer(
+            host, port, workers=jobs, cache=cache, tracer=tracer, on_done=on_done,
+            original_language=original_language,
+            keep_cut=keep_cut,
+            offset=offset,
+            exporter=exporter,
+            max_procs=max_procs,
+            temp_dir=temp_dir,
+            journal=journal,
+            resume=resume,
+            languages=languages,
+            exclude_tracks=exclude_tracks
+        )
+    except OSError as e:
+        console.print(f"[ERROR]: Unable to listen on {host}:{port or 8470}, {e}")
+        sys.exit(1)
+
+    console.print(f"Listening on {server.url}, processing up to {jobs} Projects at a time...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("Stopped.")
+
+
+@main.command()
+@click.argument("folder", type=Path)
+@click.option("-q", "--queue", "queue_dir", type=Path, default=None,
+              help="Shared queue directory the workers claim Projects in. Defaults to .subredo-queue in FOLDER.")
+@click.option("--lease-time", type=click.FloatRange(min=1), default=60.0,
+              help="Seconds a claim on a Project lasts unless renewed, after which it's taken as abandoned by a "
+                   "crashed worker and reclaimed. Claims are renewed every quarter of this while working.")
+@click.option("--poll-interval", type=click.FloatRange(min=0), default=10.0,
+              help="Seconds between checks on the Projects claimed by other workers, while waiting for them.")
+@click.option("--retry", is_flag=True, default=False,
+              help="Also process Projects that previously failed.")
+@project_options
+def worker(
+    folder: Path, queue_dir: Optional[Path], lease_time: float, poll_interval: float, retry: bool,
+    original_language: str, keep_cut: bool, offset: int, exporter: Optional[str], max_procs: Optional[int],
+    cache_dir: Optional[Path], cache_size: int, no_cache: bool, temp_dir: Optional[Path], trace_file: Optional[Path],
+    journal_file: Optional[Path], resume: bool, languages: Optional[list[str]], exclude_tracks: Optional[list[int]]
+):
+    """
+    Process the Projects in a folder together with workers on other machines.
+
+    \b
+    FOLDER    Folder of VideoReDo project files (.Vprj), e.g. on a network share.
+
+    Run a worker on each machine, with the same FOLDER and queue, possibly mounted at
+    different paths. Each worker claims the next Project no other worker claimed and
+    processes it, until every Project is done. A Project is only processed again if
+    it's modified, or with --retry if it failed. A worker that crashes leaves its claim
+    behind, which other workers take over once the --lease-time passes. Several workers
+    may also run on the same machine.
+    """
+    console = get_console(is_plain())
+
+    if not folder.is_dir():
+        console.print(f"[ERROR]: The folder \"{folder}\" does not exist.")
+        sys.exit(1)
+
+    from subredo.pipeline import process_project
+    from subredo.workqueue import WorkQueue, work
+
+    cache = get_cache(cache_dir, cache_size, no_cache)
+    tracer = get_tracer(trace_file)
+    journal = get_journal(journal_file, resume, console)
+    queue = WorkQueue(queue_dir or folder / ".subredo-queue", folder, lease_time=lease_time)
+
+    def process(project: Path) -> Path:
+        console.print(f"Processing {project.relative_to(folder)}")
+        return process_project(
+            project, cut_video=None, max_procs=max_procs, cache=cache, temp_dir=temp_dir, plain=is_plain(),
+            tracer=tracer, journal=journal, resume=resume, original_language=original_language, keep_cut=keep_cut,
+            offset=offset, exporter=exporter, languages=languages, exclude_tracks=exclude_tracks
+        )
+
+    def on_result(project: Path, output: Optional[Path], error: Optional[Exception], lost: bool) -> None:
+        if error:
+            console.print(f"[ERROR]: Failed to process {project.relative_to(folder)}, {error}")
+        else:
+            console.print(f"Processed {project.relative_to(folder)} to {output.name}")
+        if lost:
+            console.print(
+                f"[WARNING]: The claim on {project.relative_to(folder)} was lost while processing it, "
+                f"another worker may have processed it too. Is --lease-time too short?"
+            )
+        if cache:
+            cache.evict()
+        if tracer:
+            tracer.write(trace_file)
+
+    console.print(f"Working on {folder} as {queue.worker}...")
+    try:
+        results = work(queue, process, retry=retry, poll=poll_interval, on_result=on_result)
+    except KeyboardInterrupt:
+        console.print("Stopped.")
+        sys.exit(1)
+
+    console.print(f"Finished every Project in {folder}, {len(results)} of them by this worker.")
+    if tracer:
+        write_trace(tracer, trace_file, console)
+
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+
+@main.group()
+def client():
+    """Submit Projects to, and check on the Jobs of, a job server started with `serve`."""
+
+
+def server_option(func):
+    return click.option("--url", type=str, default=None, envvar="SUBREDO_SERVER",
+                        help="URL of the job server. Defaults to http://127.0.0.1:8470, or the SUBREDO_SERVER "
+                             "environment variable.")(func)
+
+
+def get_job_table(jobs: list[dict]) -> Table:
+    """Get a table of Jobs as returned by the job server."""
+    table = Table(title="Jobs")
+    table.add_column("#", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Project", style="magenta")
+    table.add_column("Status")
+    table.add_column("Result")
+    for job in jobs:
+        table.add_row(
+            str(job["id"]),
+            Path(job["project"]).name,
+            job["status"] if job["status"] != "failed" else f"[bold red]{job['status']}[/]",
+            job["error"] or job["progress"] or (Path(job["output"]).name if job["output"] else "")
+        )
+    return table
+
+
+@client.command()
+@click.argument("projects", type=Path, nargs=-1, required=True)
+@click.option("-c", "--cut-video", type=Path, default=None,
+              help="Manually exported cut video to mux the Subtitles to. Only for a single Project.")
+@click.option("--original-language", type=str, default=None,
+              help="Declare the Original Language for this Video's Subtitle flags.")
+@click.option("--keep-cut/--no-keep-cut", default=None,
+              help="Keep the original Cut Video after multiplexing a Cut Video with the Subtitles.")
+@click.option("--offset", type=click.IntRange(min=0), default=None,
+              help="Initial Subtitle Sync adjustment offset in milliseconds.")
+@click.option("--exporter", type=click.Choice(["videoredo", "mkvmerge"]), default=None,
+              help="How to export the Cut Video.")
+@click.option("-w", "--wait", is_flag=True, default=False,
+              help="Wait for the Projects to be processed, showing their progress.")
+@server_option
+def submit(
+    projects: list[Path], cut_video: Optional[Path], original_language: Optional[str], keep_cut: Optional[bool],
+    offset: Optional[int], exporter: Optional[str], wait: bool, url: Optional[str]
+):
+    """
+    Submit Projects to the job server.
+
+    \b
+    PROJECTS    One or more VideoReDo project files (.Vprj), or folders of them.
+
+    Options that are not given are those the server was started with.
+    """
+    import time
+    from subredo.client import DEFAULT_URL, Client, ClientError
+
+    console = get_console(is_plain())
+    project_files = [
+        project_file
+        for x in projects
+        for project_file in (x.glob("*.Vprj") if x.is_dir() else [x])
+    ]
+    if cut_video and len(project_files) > 1:
+        console.print("[Error]: -c/--cut-video can only be used with a single Project.")
+        sys.exit(1)
+
+    options = dict(original_language=original_language, keep_cut=keep_cut, offset=offset, exporter=exporter)
+    options = {name: value for name, value in options.items() if value is not None}
+
+    server = Client(url or DEFAULT_URL)
+    try:
+        jobs = [server.submit(project, cut_video, **options) for project in project_files]
+        for job in jobs:
+            console.print(f"Submitted {Path(job['project']).name} as Job {job['id']}")
+        if not wait:
+            return
+
+        pending = {job["id"] for job in jobs}
+        with console.status("Waiting for the Jobs...") as status:
+            while pending:
+                time.sleep(0.5)
+                jobs = [server.get_job(job["id"]) for job in jobs]
+                for job in jobs:
+                    if job["id"] in pending and job["status"] not in ("queued", "running"):
+                        pending.remove(job["id"])
+                        name = Path(job["project"]).name
+                        if job["status"] == "done":
+                            console.print(f"[Job {job['id']}] Processed {name}")
+                        elif job["status"] == "failed":
+                            console.print(f"[Job {job['id']}] [ERROR]: Failed to process {name}, {job['error']}")
+                        else:
+                            console.print(f"[Job {job['id']}] {name} was cancelled")
+                running = [job for job in jobs if job["status"] == "running"]
+                status.update(f"Waiting for {len(pending)} Jobs... " + " ".join(
+                    f"[Job {job['id']}] {job['progress'] or 'Running'}" for job in running
+                ))
+    except ClientError as e:
+        console.print(f"[ERROR]: {e}")
+        sys.exit(1)
+
+    console.print(get_job_table(jobs))
+    if any(job["status"] != "done" for job in jobs):
+        sys.exit(1)
+
+
+@client.command(name="status")
+@click.argument("job_id", type=int, required=False)
+@server_option
+def status_(job_id: Optional[int], url: Optional[str]):
+    """
+    List the Jobs of the job server, or show a Job with the most recent lines of its output.
+
+    \b
+    JOB_ID    The Job to show. All Jobs are listed if not given.
+    """
+    from subredo.client import DEFAULT_URL, Client, ClientError
+
+    console = get_console(is_plain())
+    server = Client(url or DEFAULT_URL)
+    try:
+        if job_id is None:
+            console.print(get_job_table(server.get_jobs()))
+            return
+        job = server.get_job(job_id)
+    except ClientError as e:
+        console.print(f"[ERROR]: {e}")
+        sys.exit(1)
+
+    for line in job["log"]:
+        console.print(line, markup=False)
+    console.print(get_job_table([job]))
+
+
+@client.command()
+@click.argument("job_id", type=int)
+@server_option
+def cancel(job_id: int, url: Optional[str]):
+    """Cancel a Job that did not start yet."""
+    from subredo.client import DEFAULT_URL, Client, ClientError
+
+    console = get_console(is_plain())
+    try:
+        Client(url or DEFAULT_URL).cancel(job_id)
+    except ClientError as e:
+        console.print(f"[ERROR]: {e}")
+        sys.exit(1)
+    console.print(f"Cancelled Job {job_id}")
+
+
+if __name__ == "__main__":
+    main()
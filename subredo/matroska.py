@@ -0,0 +1,499 @@
+from __future__ import annotations
+
+import mmap
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional
+
+EBML = 0x1A45DFA3
+DOC_TYPE = 0x4282
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_TYPE = 0x83
+TRACK_UID = 0x73C5
+FLAG_DEFAULT = 0x88
+FLAG_FORCED = 0x55AA
+NAME = 0x536E
+LANGUAGE = 0x22B59C
+LANGUAGE_BCP47 = 0x22B59D
+CODEC_ID = 0x86
+DEFAULT_DURATION = 0x23E383
+CONTENT_ENCODINGS = 0x6D80
+CONTENT_ENCODING = 0x6240
+CONTENT_COMPRESSION = 0x5034
+CONTENT_COMP_ALGO = 0x4254
+CONTENT_COMP_SETTINGS = 0x4255
+CONTENT_ENCRYPTION = 0x5035
+CUES = 0x1C53BB6B
+CUE_POINT = 0xBB
+CUE_TRACK_POSITIONS = 0xB7
+CUE_TRACK = 0xF7
+CUE_CLUSTER_POSITION = 0xF1
+CLUSTER = 0x1F43B675
+TIMESTAMP = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+TAGS = 0x1254C367
+TAG = 0x7373
+TARGETS = 0x63C0
+TAG_TRACK_UID = 0x63C5
+SIMPLE_TAG = 0x67C8
+TAG_NAME = 0x45A3
+TAG_STRING = 0x4487
+
+TRACK_TYPE_VIDEO = 1
+TRACK_TYPE_SUBTITLE = 17
+
+COMPRESSION_ZLIB = 0
+COMPRESSION_HEADER_STRIPPING = 3
+
+DOC_TYPES = ("matroska", "webm")
+
+
+class Track:
+    """An entry of the Tracks element of a Matroska file, with only the fields SubReDo uses."""
+    __slots__ = (
+        "number", "type", "codec_id", "language", "name", "default", "forced", "default_duration",
+        "compression", "encrypted", "uid"
+    )
+
+    def __init__(
+        self, number: int, type_: int, codec_id: str, language: str, name: Optional[str],
+        default: bool, forced: bool, default_duration: Optional[int],
+        compression: Optional[tuple[int, bytes]] = None, encrypted: bool = False, uid: Optional[int] = None
+    ):
+        self.number = number
+        self.type = type_
+        self.codec_id = codec_id
+        self.language = language
+        self.name = name
+        self.default = default
+        self.forced = forced
+        self.default_duration = default_duration
+        self.compression = compression
+        self.encrypted = encrypted
+        self.uid = uid
+
+
+class Header:
+    """The parts of a Matroska Segment that come before, or describe, its Clusters."""
+    __slots__ = ("segment_start", "segment_end", "timestamp_scale", "tracks", "positions")
+
+    def __init__(
+        self, segment_start: int, segment_end: int, timestamp_scale: int, tracks: list[Track],
+        positions: dict[int, int]
+    ):
+        self.segment_start = segment_start
+        self.segment_end = segment_end
+        self.timestamp_scale = timestamp_scale
+        self.tracks = tracks
+        # absolute offsets of the top-level elements, by element ID, as found or from the SeekHead
+        self.positions = positions
+
+
+class Block:
+    """
+    A frame of a Track within a Cluster, without its data.
+
+    The timestamp and duration are in nanoseconds, and start and end are the
+    offsets of the (possibly compressed) frame data.
+    """
+    __slots__ = ("track", "timestamp", "duration", "start", "end")
+
+    def __init__(self, track: int, timestamp: int, duration: Optional[int], start: int, end: int):
+        self.track = track
+        self.timestamp = timestamp
+        self.duration = duration
+        self.start = start
+        self.end = end
+
+
+def read_vint(data: mmap.mmap | bytes, pos: int) -> tuple[int, int]:
+    """Read an EBML variable-size integer, returning its value without the length marker, and its length."""
+    first = data[pos]
+    if first == 0:
+        raise ValueError(f"Invalid EBML variable-size integer at offset {pos}")
+    length = 9 - first.bit_length()
+    if pos + length > len(data):
+        raise ValueError(f"Truncated EBML variable-size integer at offset {pos}")
+    value = first & (0xFF >> length)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    return value, length
+
+
+def iter_elements(data: mmap.mmap | bytes, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+    """
+    Iterate the EBML elements between start and end, yielding their ID and data range.
+
+    Elements of unknown size, like a live-written Segment, are treated as spanning to
+    the end. Iteration stops at the first element that's cut short.
+    """
+    pos = start
+    while pos < end:
+        id_length = 9 - data[pos].bit_length()
+        if id_length > 4:
+            raise ValueError(f"Invalid EBML element ID at offset {pos}")
+        if pos + id_length >= end:
+            return
+        element_id = int.from_bytes(data[pos:pos + id_length], "big")
+        size, size_length = read_vint(data, pos + id_length)
+        data_start = pos + id_length + size_length
+        if size == (1 << (7 * size_length)) - 1:
+            data_end = end
+        else:
+            data_end = data_start + size
+        if data_end > end:
+            return
+        yield element_id, data_start, data_end
+        pos = data_end
+
+
+def read_uint(data: mmap.mmap | bytes, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def read_string(data: mmap.mmap | bytes, start: int, end: int) -> str:
+    return data[start:end].rstrip(b"\0").decode("utf8", "replace")
+
+
+def read_track(data: mmap.mmap | bytes, start: int, end: int) -> Track:
+    fields = {
+        element_id: (data_start, data_end)
+        for element_id, data_start, data_end in iter_elements(data, start, end)
+    }
+
+    def uint(element_id: int, default: Optional[int]) -> Optional[int]:
+        if element_id not in fields:
+            return default
+        return read_uint(data, *fields[element_id])
+
+    def string(element_id: int) -> Optional[str]:
+        if element_id not in fields:
+            return None
+        return read_string(data, *fields[element_id])
+
+    compression = None
+    encrypted = False
+    if CONTENT_ENCODINGS in fields:
+        for encoding_id, encoding_start, encoding_end in iter_elements(data, *fields[CONTENT_ENCODINGS]):
+            if encoding_id != CONTENT_ENCODING:
+                continue
+            for child_id, child_start, child_end in iter_elements(data, encoding_start, encoding_end):
+                if child_id == CONTENT_ENCRYPTION:
+                    encrypted = True
+                elif child_id == CONTENT_COMPRESSION:
+                    settings = {
+                        x_id: (x_start, x_end)
+                        for x_id, x_start, x_end in iter_elements(data, child_start, child_end)
+                    }
+                    compression = (
+                        read_uint(data, *settings[CONTENT_COMP_ALGO]) if CONTENT_COMP_ALGO in settings else 0,
+                        bytes(data[slice(*settings[CONTENT_COMP_SETTINGS])]) if CONTENT_COMP_SETTINGS in settings else b""
+                    )
+
+    return Track(
+        number=uint(TRACK_NUMBER, 0),
+        type_=uint(TRACK_TYPE, 0),
+        codec_id=string(CODEC_ID) or "",
+        language=string(LANGUAGE_BCP47) or string(LANGUAGE) or "eng",
+        name=string(NAME),
+        default=bool(uint(FLAG_DEFAULT, 1)),
+        forced=bool(uint(FLAG_FORCED, 0)),
+        default_duration=uint(DEFAULT_DURATION, None),
+        compression=compression,
+        encrypted=encrypted,
+        uid=uint(TRACK_UID, None)
+    )
+
+
+def read_track_entries(data: mmap.mmap | bytes, start: int, end: int) -> list[Track]:
+    return [
+        read_track(data, entry_start, entry_end)
+        for entry_id, entry_start, entry_end in iter_elements(data, start, end)
+        if entry_id == TRACK_ENTRY
+    ]
+
+
+def read_header(data: mmap.mmap | bytes) -> Header:
+    """
+    Read the Header of Matroska (or WebM) data.
+
+    Only the EBML header and the Segment's top-level elements are read, stopping at
+    the first Cluster, so none of the media data is touched. Elements that come
+    after the Clusters, like the Tracks of some files or the Cues, are found with
+    the SeekHead. Raises a ValueError if the data is not Matroska or has no Tracks.
+    """
+    elements = iter_elements(data, 0, len(data))
+    element_id, start, end = next(elements, (None, 0, 0))
+    if element_id != EBML:
+        raise ValueError("Not an EBML file")
+    doc_type = next((
+        read_string(data, data_start, data_end)
+        for child_id, data_start, data_end in iter_elements(data, start, end)
+        if child_id == DOC_TYPE
+    ), None)
+    if doc_type not in DOC_TYPES:
+        raise ValueError(f"Unsupported EBML document type {doc_type!r}")
+
+    segment = next(((start, end) for element_id, start, end in elements if element_id == SEGMENT), None)
+    if not segment:
+        raise ValueError("No Matroska Segment found")
+    segment_start, segment_end = segment
+
+    positions: dict[int, int] = {}
+    offset = segment_start
+    for element_id, start, end in iter_elements(data, segment_start, segment_end):
+        if element_id == SEEK_HEAD:
+            for target, position in read_seek_head(data, start, end):
+                positions.setdefault(target, segment_start + position)
+        else:
+            positions[element_id] = offset
+        if element_id == CLUSTER:
+            break
+        offset = end
+
+    timestamp_scale = 1000000
+    info = read_element_at(data, positions.get(INFO), segment_end, INFO)
+    if info:
+        for child_id, child_start, child_end in iter_elements(data, *info):
+            if child_id == TIMESTAMP_SCALE:
+                timestamp_scale = read_uint(data, child_start, child_end)
+
+    tracks = read_element_at(data, positions.get(TRACKS), segment_end, TRACKS)
+    if not tracks:
+        raise ValueError("No Matroska Tracks found")
+
+    return Header(segment_start, segment_end, timestamp_scale, read_track_entries(data, *tracks), positions)
+
+
+def read_tracks(data: mmap.mmap | bytes) -> list[Track]:
+    """Read the Tracks of Matroska (or WebM) data. See read_header."""
+    return read_header(data).tracks
+
+
+def read_seek_head(data: mmap.mmap | bytes, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """Iterate the element IDs in a SeekHead and their positions, relative to the Segment's data."""
+    for element_id, seek_start, seek_end in iter_elements(data, start, end):
+        if element_id != SEEK:
+            continue
+        fields = {
+            child_id: (child_start, child_end)
+            for child_id, child_start, child_end in iter_elements(data, seek_start, seek_end)
+        }
+        if SEEK_ID in fields and SEEK_POSITION in fields:
+            yield read_uint(data, *fields[SEEK_ID]), read_uint(data, *fields[SEEK_POSITION])
+
+
+def read_element_at(
+    data: mmap.mmap | bytes, offset: Optional[int], end: int, element_id: int
+) -> Optional[tuple[int, int]]:
+    """Get the data range of the element at an offset, if there is one and it has the expected ID."""
+    if offset is None or offset >= end:
+        return None
+    for found_id, start, found_end in iter_elements(data, offset, end):
+        if found_id == element_id:
+            return start, found_end
+        break
+    return None
+
+
+def read_frame_counts(data: mmap.mmap | bytes, header: Header) -> dict[int, int]:
+    """
+    Get the amount of frames of each Track, by Track UID, from the statistics Tags mkvmerge writes.
+
+    Tracks without a NUMBER_OF_FRAMES Tag are left out.
+    """
+    tags = read_element_at(data, header.positions.get(TAGS), header.segment_end, TAGS)
+    if not tags:
+        return {}
+
+    counts = {}
+    for tag_id, tag_start, tag_end in iter_elements(data, *tags):
+        if tag_id != TAG:
+            continue
+        track_uids = []
+        frames = None
+        for child_id, child_start, child_end in iter_elements(data, tag_start, tag_end):
+            if child_id == TARGETS:
+                track_uids = [
+                    read_uint(data, target_start, target_end)
+                    for target_id, target_start, target_end in iter_elements(data, child_start, child_end)
+                    if target_id == TAG_TRACK_UID
+                ]
+            elif child_id == SIMPLE_TAG:
+                fields = {
+                    field_id: (field_start, field_end)
+                    for field_id, field_start, field_end in iter_elements(data, child_start, child_end)
+                }
+                if TAG_NAME not in fields or TAG_STRING not in fields:
+                    continue
+                if read_string(data, *fields[TAG_NAME]) == "NUMBER_OF_FRAMES":
+                    try:
+                        frames = int(read_string(data, *fields[TAG_STRING]))
+                    except ValueError:
+                        pass
+        if frames is not None:
+            for uid in track_uids:
+                counts[uid] = frames
+    return counts
+
+
+def read_cue_clusters(data: mmap.mmap | bytes, header: Header, track_numbers: set[int]) -> Optional[list[int]]:
+    """
+    Get the offsets of the Clusters the Cues index for the Tracks, in order.
+
+    Returns None if there are no Cues, or unless the Cues index every Block of each of
+    the Tracks, as otherwise Blocks in Clusters the Cues don't point to would be missed.
+    The amount of Blocks of a Track is taken from the statistics Tags mkvmerge writes,
+    so the Cues of files without them are not used.
+    """
+    cues = read_element_at(data, header.positions.get(CUES), header.segment_end, CUES)
+    if not cues:
+        return None
+
+    clusters = set()
+    indexed: dict[int, int] = {}
+    for point_id, point_start, point_end in iter_elements(data, *cues):
+        if point_id != CUE_POINT:
+            continue
+        for positions_id, positions_start, positions_end in iter_elements(data, point_start, point_end):
+            if positions_id != CUE_TRACK_POSITIONS:
+                continue
+            fields = {
+                child_id: (child_start, child_end)
+                for child_id, child_start, child_end in iter_elements(data, positions_start, positions_end)
+            }
+            if CUE_TRACK not in fields or CUE_CLUSTER_POSITION not in fields:
+                continue
+            track = read_uint(data, *fields[CUE_TRACK])
+            if track in track_numbers:
+                indexed[track] = indexed.get(track, 0) + 1
+                clusters.add(header.segment_start + read_uint(data, *fields[CUE_CLUSTER_POSITION]))
+
+    frame_counts = read_frame_counts(data, header)
+    track_uids = {track.number: track.uid for track in header.tracks}
+    if any(frame_counts.get(track_uids.get(number)) != indexed.get(number) for number in track_numbers):
+        return None
+    return sorted(clusters)
+
+
+def read_block(
+    data: mmap.mmap | bytes, start: int, end: int, cluster_timestamp: int, timestamp_scale: int,
+    duration: Optional[int] = None
+) -> Block:
+    """Read the header of a Block or SimpleBlock, leaving its frame data unread."""
+    track, length = read_vint(data, start)
+    pos = start + length
+    relative_timestamp = int.from_bytes(data[pos:pos + 2], "big", signed=True)
+    flags = data[pos + 2]
+    if flags & 0x06:
+        raise ValueError(f"Laced Blocks are not supported, at offset {start}")
+    return Block(
+        track=track,
+        timestamp=(cluster_timestamp + relative_timestamp) * timestamp_scale,
+        duration=duration * timestamp_scale if duration is not None else None,
+        start=pos + 3,
+        end=end
+    )
+
+
+def iter_cluster_blocks(
+    data: mmap.mmap | bytes, start: int, end: int, track_numbers: set[int], timestamp_scale: int
+) -> Iterator[Block]:
+    """
+    Iterate the Blocks of the Tracks within a Cluster.
+
+    Only the element headers are read, the frame data of every Block is skipped
+    over, and so is everything but the header of Blocks of other Tracks.
+    """
+    cluster_timestamp = 0
+    for element_id, element_start, element_end in iter_elements(data, start, end):
+        if element_id == TIMESTAMP:
+            cluster_timestamp = read_uint(data, element_start, element_end)
+        elif element_id == SIMPLE_BLOCK:
+            track, _ = read_vint(data, element_start)
+            if track in track_numbers:
+                yield read_block(data, element_start, element_end, cluster_timestamp, timestamp_scale)
+        elif element_id == BLOCK_GROUP:
+            block = None
+            duration = None
+            for child_id, child_start, child_end in iter_elements(data, element_start, element_end):
+                if child_id == BLOCK:
+                    track, _ = read_vint(data, child_start)
+                    if track not in track_numbers:
+                        break
+                    block = (child_start, child_end)
+                elif child_id == BLOCK_DURATION:
+                    duration = read_uint(data, child_start, child_end)
+            if block:
+                yield read_block(data, *block, cluster_timestamp, timestamp_scale, duration)
+        elif element_id == CLUSTER:
+            raise ValueError("Clusters of unknown size are not supported")
+
+
+def iter_blocks(data: mmap.mmap | bytes, header: Header, track_numbers: set[int]) -> Iterator[Block]:
+    """
+    Iterate the Blocks of the Tracks, in file order.
+
+    If the Cues index every Block of the Tracks, only the Clusters they point to are read.
+    Otherwise, every Cluster is visited by skipping from one Cluster header to the
+    next. Either way, the frame data of other Tracks is never read.
+    """
+    clusters = read_cue_clusters(data, header, track_numbers)
+    if clusters is not None:
+        for offset in clusters:
+            cluster = read_element_at(data, offset, header.segment_end, CLUSTER)
+            if not cluster:
+                raise ValueError(f"The Cues point to a missing Cluster at offset {offset}")
+            yield from iter_cluster_blocks(data, *cluster, track_numbers, header.timestamp_scale)
+        return
+
+    first_cluster = header.positions.get(CLUSTER)
+    if first_cluster is None:
+        return
+    for element_id, start, end in iter_elements(data, first_cluster, header.segment_end):
+        if element_id == CLUSTER:
+            yield from iter_cluster_blocks(data, start, end, track_numbers, header.timestamp_scale)
+
+
+def read_frame(data: mmap.mmap | bytes, block: Block, track: Track) -> bytes:
+    """Read the frame data of a Block, undoing the Track's compression."""
+    frame = bytes(data[block.start:block.end])
+    if track.encrypted:
+        raise ValueError(f"Track {track.number} is encrypted")
+    if track.compression:
+        algorithm, settings = track.compression
+        if algorithm == COMPRESSION_ZLIB:
+            try:
+                return zlib.decompress(frame)
+            except zlib.error as e:
+                raise ValueError(f"Invalid zlib compressed frame at offset {block.start}, {e}")
+        if algorithm == COMPRESSION_HEADER_STRIPPING:
+            return settings + frame
+        raise ValueError(f"Unsupported compression algorithm {algorithm} on Track {track.number}")
+    return frame
+
+
+def read(path: Path) -> list[Track]:
+    """
+    Read the Tracks of a Matroska file.
+
+    The file is memory-mapped, so only the pages holding the headers are ever read
+    from disk, which matters on network shares. See read_tracks.
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return read_tracks(data)
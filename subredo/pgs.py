@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import Timestamp
+
+HEADER = struct.Struct(">2sIIBH")
+MAGIC = b"PG"
+PTS_WRAP = 1 << 32
+
+PDS = 0x14  # Palette Definition Segment
+ODS = 0x15  # Object Definition Segment
+PCS = 0x16  # Presentation Composition Segment
+WDS = 0x17  # Window Definition Segment
+END = 0x80  # End of Display Set Segment
+
+EPOCH_START = 0x80
+FIRST_IN_SEQUENCE = 0x80
+
+
+class Segment:
+    """A single segment of a Presentation Graphic Stream (PGS)."""
+    __slots__ = ("pts", "dts", "type", "data")
+
+    def __init__(self, pts: int, dts: int, type_: int, data: bytes):
+        self.pts = pts
+        self.dts = dts
+        self.type = type_
+        self.data = data
+
+
+class DisplaySet:
+    """
+    A group of PGS segments that are displayed at the same time.
+
+    Segment timestamps are 90 kHz clock values, un-wrapped past 32 bits. The
+    image and palette data are never decoded.
+    """
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: list[Segment]):
+        self.segments = segments
+
+    @property
+    def pts(self) -> int:
+        return self.segments[0].pts
+
+    @property
+    def start(self) -> Timestamp:
+        return Timestamp(self.pts * 1000 // 9)
+
+    @property
+    def epoch_start(self) -> bool:
+        """If the Display Set resets all state, making all prior Display Sets irrelevant."""
+        pcs = self.segments[0]
+        return pcs.type == PCS and len(pcs.data) > 7 and pcs.data[7] == EPOCH_START
+
+    @property
+    def clears(self) -> bool:
+        """If the Display Set composes no objects, removing everything from the screen."""
+        pcs = self.segments[0]
+        return pcs.type == PCS and len(pcs.data) > 10 and pcs.data[10] == 0
+
+    def shifted(self, start: Timestamp) -> DisplaySet:
+        """Get a copy of the Display Set moved to start, keeping the offsets between its segments."""
+        delta = start.ticks * 9 // 1000 - self.pts
+        return DisplaySet([
+            Segment(
+                pts=max(0, segment.pts + delta),
+                dts=max(0, segment.dts + delta) if segment.dts else 0,
+                type_=segment.type,
+                data=segment.data
+            )
+            for segment in self.segments
+        ])
+
+
+def iter_display_sets(f: BinaryIO) -> Iterator[DisplaySet]:
+    """Parse PGS (.sup) data into Display Sets, one Display Set at a time."""
+    segments: list[Segment] = []
+    last_pts = 0
+    pts_base = 0
+    while True:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            break
+        magic, pts, dts, type_, size = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Invalid PGS segment at offset {f.tell() - HEADER.size}")
+        data = f.read(size)
+        # 32-bit 90 kHz timestamps wrap after ~13.25 hours
+        if pts + pts_base < last_pts - PTS_WRAP // 2:
+            pts_base += PTS_WRAP
+        last_pts = pts + pts_base
+        dts = dts + pts_base if dts else 0
+        if type_ == PCS and segments:
+            yield DisplaySet(segments)
+            segments = []
+        segments.append(Segment(last_pts, dts, type_, data))
+        if type_ == END:
+            yield DisplaySet(segments)
+            segments = []
+    if segments:
+        yield DisplaySet(segments)
+
+
+def read(path: Path) -> Iterator[DisplaySet]:
+    """Stream the Display Sets of a PGS (.sup) file."""
+    with open(path, "rb") as f:
+        yield from iter_display_sets(f)
+
+
+def write(path: Path, display_sets: Iterable[DisplaySet]) -> int:
+    """
+    Stream Display Sets to a PGS (.sup) file.
+
+    The file is only created once the first Display Set arrives, so nothing is
+    written if there are none. Returns the amount of Display Sets written.
+    """
+    count = 0
+    f = None
+    try:
+        for display_set in display_sets:
+            if f is None:
+                f = open(path, "wb")
+            for segment in display_set.segments:
+                f.write(HEADER.pack(
+                    MAGIC,
+                    segment.pts % PTS_WRAP,
+                    segment.dts % PTS_WRAP,
+                    segment.type,
+                    len(segment.data)
+                ))
+                f.write(segment.data)
+            count += 1
+    finally:
+        if f is not None:
+            f.close()
+    return count
+
+
+def collapse(display_sets: list[DisplaySet], showing: bool) -> Optional[DisplaySet]:
+    """
+    Merge Display Sets into one Display Set with the state the last of them leaves.
+
+    It composes what the last Display Set composes, and defines the window, and the
+    latest version of each palette and object, defined since the last Epoch Start
+    among them, as a later Display Set may compose them again without defining them.
+    All of its segments are at the time of the last Display Set. Returns None if it
+    would only clear the screen while nothing is shown, or if none of them have a PCS.
+    """
+    if len(display_sets) == 1:
+        display_set = display_sets[0]
+        return None if display_set.clears and not showing and len(display_set.segments) <= 2 else display_set
+
+    pcs = None
+    epoch_start = False
+    windows: list[Segment] = []
+    palettes: dict[int, Segment] = {}
+    objects: dict[bytes, list[Segment]] = {}
+    for display_set in display_sets:
+        if display_set.epoch_start:
+            epoch_start = True
+            windows, palettes, objects = [], {}, {}
+        for segment in display_set.segments:
+            if segment.type == PCS:
+                pcs = segment
+            elif segment.type == WDS:
+                windows = [segment]
+            elif segment.type == PDS and segment.data:
+                palettes[segment.data[0]] = segment
+            elif segment.type == ODS and len(segment.data) > 3:
+                # an object may be split across segments, its first one replaces its previous version
+                object_id = segment.data[:2]
+                if segment.data[3] & FIRST_IN_SEQUENCE or object_id not in objects:
+                    objects[object_id] = []
+                objects[object_id].append(segment)
+    if pcs is None:
+        return None
+
+    data = bytearray(pcs.data)
+    if len(data) > 8:
+        if epoch_start:
+            data[7] = EPOCH_START
+        data[8] = 0  # not just a palette update of the previous composition anymore
+    definitions = [*windows, *palettes.values(), *(x for segments in objects.values() for x in segments)]
+    display_set = DisplaySet([
+        Segment(pcs.pts, pcs.dts, segment.type, segment.data)
+        for segment in [Segment(0, 0, PCS, bytes(data)), *definitions, Segment(0, 0, END, b"")]
+    ])
+    if display_set.clears and not showing and not definitions:
+        return None
+    return display_set
+
+
+def cut(display_sets: Iterable[DisplaySet], timeline: TimelineMapper) -> Iterator[DisplaySet]:
+    """
+    Apply Cuts to the Display Sets, keeping only what's within the kept segments.
+
+    Display Sets within a kept segment are moved to their position on the Cut
+    timeline. Display Sets within a cut are not just dropped, as they may clear a
+    caption shown before the cut, or define objects and palettes used after it.
+    They're collapsed into a single Display Set with the state they leave, see
+    collapse(), moved to where the cut is on the Cut timeline.
+    """
+    pending: list[DisplaySet] = []
+    pending_start: Optional[Timestamp] = None
+    showing = False  # if a caption is shown as of the last Display Set yielded
+
+    for display_set in display_sets:
+        start = timeline.map(display_set.start)
+        cut_start = timeline.clamp(display_set.start) if start is None else None
+        if pending and cut_start != pending_start:
+            held = collapse(pending, showing)
+            if held:
+                yield held.shifted(pending_start)
+                showing = not held.clears
+            pending = []
+        if start is None:
+            pending_start = cut_start
+            pending.append(display_set)
+            continue
+        yield display_set.shifted(start)
+        showing = not display_set.clears
+
+    if pending:
+        held = collapse(pending, showing)
+        if held:
+            yield held.shifted(pending_start)
@@ -0,0 +1,627 @@
+from __future__ import annotations
+
+import os
+import platform
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Collection, Optional, Sequence
+
+from subredo import demux, pgs, trace
+from subredo.cache import Cache
+from subredo.console import AnyConsole, Table, get_console
+from subredo.cuestore import CueStore
+from subredo.helpers import (
+    mux_subtitles, Subtitle, export_cut, extract_subtitles, get_extension, identify, split_parts
+)
+from subredo.journal import DONE, EXPORT, Journal
+from subredo.planner import get_plan
+from subredo.probe import LANGUAGES, MediaSummary, TextTrack, probe
+from subredo.runner import run_jobs
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import Timestamp
+from subredo.trace import Tracer, call_traced
+from subredo.videoredoproject import VideoReDoProject
+from subredo.watch import get_fingerprint
+
+
+def process_projects(
+    project_files: list[Path],
+    jobs: int = 1,
+    on_result: Optional[Callable[[Path, Optional[Path], Optional[Exception]], None]] = None,
+    tracer: Optional[Tracer] = None,
+    plain: bool = False,
+    **options: Any
+) -> list[tuple[Path, Optional[Path], Optional[Exception]]]:
+    """
+    Process Projects one after another, or `jobs` at a time in separate processes.
+
+    Results are reported, and passed to on_result, in the order the Projects were given.
+    A Project failing does not stop the others. A summary is printed when processing
+    more than one Project. Returns the output path or error of each Project.
+
+    The Spans of every Project are recorded with the Tracer, if any, including those
+    recorded in the separate processes. Output is plain text if plain.
+    """
+    console = get_console(plain)
+    results: list[tuple[Path, Optional[Path], Optional[Exception]]] = []
+
+    def add_result(project: Path, output: Optional[Path], error: Optional[Exception]) -> None:
+        results.append((project, output, error))
+        if on_result:
+            on_result(project, output, error)
+
+    if jobs == 1 or len(project_files) == 1:
+        for project in project_files:
+            console.print(f"Processing {project.name}")
+            try:
+                add_result(project, process_project(project, tracer=tracer, plain=plain, **options), None)
+            except Exception as e:
+                console.print(f"[ERROR]: Failed to process {project.name}, {e}")
+                add_result(project, None, e)
+    else:
+        # only imported when needed, as it loads multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(call_traced, process_project, project, **options, plain=plain, quiet=True)
+                if tracer else
+                pool.submit(process_project, project, **options, plain=plain, quiet=True)
+                for project in project_files
+            ]
+            # results are reported in the order the projects were given, not as they finish
+            for i, (project, future) in enumerate(zip(project_files, futures)):
+                try:
+                    output = future.result()
+                    if tracer:
+                        output, error, spans = output
+                        tracer.add(*spans)
+                        if error:
+                            raise error
+                    add_result(project, output, None)
+                    console.print(f"[{i + 1}/{len(project_files)}] Processed {project.name}")
+                except Exception as e:
+                    add_result(project, None, e)
+                    console.print(f"[{i + 1}/{len(project_files)}] [ERROR]: Failed to process {project.name}, {e}")
+
+    if len(results) > 1:
+        summary_table = Table(title="Summary")
+        summary_table.add_column("Project", style="cyan")
+        summary_table.add_column("Result")
+        for project, output, error in results:
+            summary_table.add_row(
+                project.name,
+                f"[green]{output.name}[/]" if output else f"[bold red]{type(error).__name__}: {error}[/]"
+            )
+        console.print(summary_table)
+
+    return results
+
+
+def process_project(
+    project: Path, cut_video: Optional[Path], original_language: str, keep_cut: bool, offset: int,
+    exporter: Optional[str] = None, max_procs: Optional[int] = None, cache: Optional[Cache] = None,
+    temp_dir: Optional[Path] = None, quiet: bool = False, plain: bool = False, tracer: Optional[Tracer] = None,
+    console: Optional[AnyConsole] = None, videoredo: Optional[VideoReDoExporter] = None,
+    journal: Optional[Journal] = None, resume: bool = False, languages: Optional[Sequence[str]] = None,
+    exclude_tracks: Optional[Sequence[int]] = None
+) -> Path:
+    """
+    Apply the Cuts of a VideoReDo Project on the Subtitles of its Source, and mux them to the Cut Video.
+
+    All intermediate files are kept in a temporary work directory unique to this call,
+    so any amount of Projects can be processed at the same time from the same directory.
+    At most `max_procs` external tool processes are run at once, one per CPU by default.
+    The Source's probe and extracted Subtitle tracks are read from and written to the
+    Cache, if one is provided.
+
+    With the mkvmerge exporter, the Cut Video is exported from the Source with its
+    Subtitles in a single pass, and no Subtitle track is processed separately.
+
+    A VideoReDo Cut Video export is written to the work directory unless it's kept,
+    so the final Cut Video with the Subtitles is the only full copy written next to
+    the Project. It's muxed to a partial file that then replaces the final path, so an
+    interrupted run never leaves a truncated Cut Video behind.
+
+    VideoReDo is started for this Project alone, unless a VideoReDoExporter is given
+    to keep it running between Projects.
+
+    Only the Subtitle tracks in the languages, if any, and not excluded by their Track
+    ID, are processed. Tracks without Captions in the kept segments are left out before
+    they are extracted, when the Source is Matroska.
+
+    With a Journal, the completed stages are recorded to it, and the VideoReDo Cut
+    Video export is written next to the Project until the mux succeeds, so it's not lost
+    on a crash. If resuming, a Project already processed with the same inputs and
+    options is skipped, and an earlier Cut Video export of it is used instead of
+    exporting it again, as long as their files are unchanged.
+
+    Each stage and external tool run is recorded with the Tracer, if any. Output is
+    printed to the given Console, otherwise it's plain text if plain, and nothing is
+    printed if quiet.
+
+    Returns the path to the Cut Video with the Subtitles.
+    """
+    with trace.span(tracer, "Process Project", project=str(project)):
+        return _process_project(
+            project, cut_video, original_language, keep_cut, offset, exporter, max_procs, cache, temp_dir,
+            console or get_console(plain, quiet), tracer, videoredo, journal, resume, languages, exclude_tracks
+        )
+
+
+def _process_project(
+    project: Path, cut_video: Optional[Path], original_language: str, keep_cut: bool, offset: int,
+    exporter: Optional[str], max_procs: Optional[int], cache: Optional[Cache], temp_dir: Optional[Path],
+    console: AnyConsole, tracer: Optional[Tracer], videoredo: Optional[VideoReDoExporter], journal: Optional[Journal],
+    resume: bool, languages: Optional[Sequence[str]], exclude_tracks: Optional[Sequence[int]]
+) -> Path:
+    with trace.span(tracer, "Load Project"):
+        video_redo_project = VideoReDoProject.load_file(project)
+
+    if journal:
+        fingerprint = get_fingerprint(video_redo_project, dict(
+            cut_video=str(cut_video) if cut_video else None,
+            original_language=original_language,
+            offset=offset,
+            exporter=exporter,
+            languages=sorted(languages or []),
+            exclude_tracks=sorted(exclude_tracks or [])
+        ))
+        # the export only depends on the Project
+        export_fingerprint = get_fingerprint(video_redo_project, {})
+        output = resume and journal.get(project, DONE, fingerprint)
+        if output:
+            console.print(f"Skipping {project.name}, it was already processed to {output.name}")
+            return output
+
+    source = video_redo_project.filename
+    cache_key = cache.key(source) if cache else None
+
+    summary_data = cache.get_probe(cache_key) if cache else None
+    if summary_data:
+        summary = MediaSummary.from_dict(summary_data)
+    else:
+        with trace.span(tracer, "Probe Source", source=str(source)):
+            summary = probe(source)
+        if cache:
+            cache.put_probe(cache_key, summary.to_dict())
+    frame_time = Timestamp.from_frames(1, summary.fps)
+
+    if cut_video:
+        exporter = None
+    elif not exporter:
+        if platform.system() == "Windows":
+            exporter = "videoredo"
+        elif project.with_suffix(".mkv").exists():
+            cut_video = project.with_suffix(".mkv")
+        else:
+            exporter = "mkvmerge"
+    if exporter:
+        cut_video = project.with_stem(f"{project.stem} (SubReDo)").with_suffix(".mkv")
+    cut_with_subs = cut_video.with_stem(cut_video.stem + " (with Subs)")
+
+    with trace.span(tracer, "Plan Segments", cuts=len(video_redo_project.cut_list)):
+        plan = get_plan(video_redo_project, frame_time)
+    for sequence in plan.ignored:
+        # it didn't cut away anything duration-wise, likely header data
+        console.print(f"Ignoring Cut #{sequence} as it's a duration-less cut and will not affect Subtitles")
+    console.print(plan.get_table())
+    timeline = TimelineMapper(plan.timestamps(), offset=Timestamp.from_milliseconds(offset))
+    console.print("Final Duration:", timeline.duration - offset)
+
+    skipped = get_excluded_tracks(summary.text_tracks, languages, exclude_tracks)
+    with trace.span(tracer, "Check Subtitle Tracks"):
+        skipped.update(find_empty_tracks(
+            source, [x for x in summary.text_tracks if x.stream_index not in skipped], timeline
+        ))
+    subtitles = [x for x in summary.text_tracks if x.stream_index not in skipped]
+    if summary.text_tracks:
+        console.print(get_track_table(summary.text_tracks, skipped))
+
+    if exporter == "mkvmerge":
+        export_with_subtitles(
+            source, cut_with_subs, timeline, summary.text_tracks, original_language, offset, console, tracer, skipped
+        )
+        if journal:
+            journal.record(project, DONE, fingerprint, cut_with_subs)
+        return cut_with_subs
+
+    with tempfile.TemporaryDirectory(prefix="rlaphoenix-subredo", dir=temp_dir) as work_dir:
+        work_dir = Path(work_dir)
+
+        # the export depends only on the Project, so it runs while the Subtitles are processed
+        export_future = None
+        export_progress = {"percent": 0.0}
+        export_cancel = threading.Event()
+
+        def on_export_progress(percent: float) -> None:
+            export_progress["percent"] = percent
+
+        exported = journal.get(project, EXPORT, export_fingerprint) if journal and resume else None
+        if exporter == "videoredo" and exported:
+            console.print(f"Using the earlier Cut Video export {exported.name}")
+            cut_video = exported
+        elif exporter == "videoredo":
+            if not keep_cut and not journal:
+                # only an intermediate, keep it off of the output's disk
+                cut_video = work_dir / cut_video.name
+            if videoredo:
+                export_future = videoredo.submit(project, cut_video, on_export_progress, export_cancel, tracer)
+            else:
+                export_pool = ThreadPoolExecutor(max_workers=1)
+                export_future = export_pool.submit(
+                    export_project, project, cut_video, on_export_progress, export_cancel, tracer
+                )
+                export_pool.shutdown(wait=False)
+
+        try:
+            cut_files = process_subtitles(
+                source, subtitles, timeline, work_dir, console, max_procs, cache, cache_key, tracer
+            )
+        except BaseException:
+            if export_future:
+                export_cancel.set()
+                wait((export_future,))
+            raise
+
+        if export_future:
+            with console.status("Waiting for the Cut Video export...") as status, \
+                    trace.span(tracer, "Wait for Cut Video Export"):
+                while not export_future.done():
+                    status.update(f"Waiting for the Cut Video export ({export_progress['percent']:.2f}%)...")
+                    wait((export_future,), timeout=0.2)
+                export_future.result()
+            if journal:
+                journal.record(project, EXPORT, export_fingerprint, cut_video)
+
+        with console.status("Muxing Subtitles to MKV...") as status, trace.span(tracer, "Mux Subtitles"):
+            subs = [
+                Subtitle(
+                    path=cut_files[sub.stream_index],
+                    name=sub.title,
+                    language=sub.language,
+                    forced=sub.forced,
+                    default=sub.default,
+                    sdh="SDH" in (sub.title or ""),
+                    original_lang=sub.language == original_language,
+                    # split tracks are cut as-is, so the initial offset is applied when muxing
+                    delay=offset if cut_files[sub.stream_index].suffix == ".mks" else 0
+                )
+                for sub in subtitles
+            ]
+            partial_file = cut_with_subs.with_name(f".{cut_with_subs.stem}.partial{cut_with_subs.suffix}")
+            try:
+                run_jobs(
+                    [mux_subtitles(cut_video, partial_file, subs)],
+                    concurrency=max_procs,
+                    on_progress=lambda job: status.update(f"Muxing Subtitles to MKV ({job})..."),
+                    tracer=tracer
+                )
+                os.replace(partial_file, cut_with_subs)
+            finally:
+                partial_file.unlink(missing_ok=True)
+
+        if not keep_cut:
+            cut_video.unlink(missing_ok=True)
+
+    if journal:
+        journal.record(project, DONE, fingerprint, cut_with_subs)
+    return cut_with_subs
+
+
+def process_subtitles(
+    source: Path, subtitles: list[TextTrack], timeline: TimelineMapper, work_dir: Path, console: AnyConsole,
+    max_procs: Optional[int] = None, cache: Optional[Cache] = None, cache_key: Optional[str] = None,
+    tracer: Optional[Tracer] = None
+) -> dict[int, Path]:
+    """
+    Extract the Subtitle tracks of the Source and apply the Cuts to them in the work directory.
+
+    Returns the paths to the Cut Subtitle tracks by stream index. A track that had no
+    Captions within the kept segments may not have a Cut file.
+    """
+    extensions = {
+        sub.stream_index: get_extension(sub.format)
+        for sub in subtitles
+    }
+    names = {
+        sub.stream_index: f"sub_{sub.track_id}_{sub.language}_{sub.title}"
+        for sub in subtitles
+    }
+    sub_files = {
+        sub_id: work_dir / f"{name}{extensions[sub_id]}"
+        for sub_id, name in names.items()
+    }
+    cut_files = {
+        sub_id: work_dir / f"{name}_cuts{extensions[sub_id]}"
+        for sub_id, name in names.items()
+    }
+
+    to_extract = dict(sub_files)
+    if cache:
+        for sub_id, extension in extensions.items():
+            cached_file = cache.get_file(cache_key, f"{sub_id}{extension}")
+            if cached_file:
+                sub_files[sub_id] = cached_file
+                del to_extract[sub_id]
+
+    if to_extract:
+        to_demux = {
+            sub.stream_index: to_extract[sub.stream_index]
+            for sub in subtitles
+            if sub.stream_index in to_extract and sub.format in demux.FORMATS
+        }
+        if to_demux:
+            with console.status(f"Demuxing {len(to_demux)} Subtitle tracks..."), \
+                    trace.span(tracer, "Demux Subtitles", tracks=len(to_demux)):
+                try:
+                    demux.extract_subtitles(source, {
+                        sub.track_id: to_demux[sub.stream_index]
+                        for sub in subtitles
+                        if sub.stream_index in to_demux
+                    })
+                except ValueError as e:
+                    console.print(f"Unable to demux the Subtitles natively, using FFmpeg instead: {e}")
+                    to_demux = {}
+
+        to_ffmpeg = {sub_id: path for sub_id, path in to_extract.items() if sub_id not in to_demux}
+        with console.status(f"Extracting {len(to_extract)} Subtitle tracks...") as status:
+            if to_ffmpeg:
+                run_jobs(
+                    [extract_subtitles(source, to_ffmpeg)],
+                    concurrency=max_procs,
+                    on_progress=lambda job: status.update(f"Extracting {len(to_ffmpeg)} Subtitle tracks ({job})..."),
+                    tracer=tracer
+                )
+            if cache:
+                for sub_id, sub_file in to_extract.items():
+                    sub_files[sub_id] = cache.put_file(cache_key, f"{sub_id}{extensions[sub_id]}", sub_file)
+
+    split_jobs = {}
+    for sub in subtitles:
+        sub_id = sub.stream_index
+        with console.status(f"Processing Subtitle #{sub_id + 1} ({sub.language} {sub.title or ''})..."), \
+                trace.span(tracer, f"Cut Subtitle ({sub.format})", track=sub.track_id, language=sub.language):
+            if extensions[sub_id] == ".srt":
+                with CueStore.load(sub_files[sub_id]) as cues:
+                    cues.cut(timeline).write(cut_files[sub_id])
+            elif extensions[sub_id] == ".sup":
+                pgs.write(cut_files[sub_id], pgs.cut(pgs.read(sub_files[sub_id]), timeline))
+            else:
+                split_jobs[sub_id] = split_parts(sub_files[sub_id], cut_files[sub_id], timeline.segments())
+
+    if split_jobs:
+        with console.status(f"Cutting {len(split_jobs)} Subtitle tracks...") as status:
+            run_jobs(
+                list(split_jobs.values()),
+                concurrency=max_procs,
+                on_progress=lambda job: status.update(f"Cutting {len(split_jobs)} Subtitle tracks ({job})..."),
+                tracer=tracer
+            )
+            for sub_id in split_jobs:
+                # mkvmerge may number the output of a split even if all parts are linked
+                numbered_file = cut_files[sub_id].with_stem(f"{cut_files[sub_id].stem}-001")
+                if not cut_files[sub_id].exists() and numbered_file.exists():
+                    numbered_file.rename(cut_files[sub_id])
+
+    return cut_files
+
+
+def get_excluded_tracks(
+    subtitles: list[TextTrack], languages: Optional[Sequence[str]] = None, exclude_tracks: Optional[Sequence[int]] = None
+) -> dict[int, str]:
+    """
+    Get the Subtitle tracks that are not to be processed, and why, by their stream index.
+
+    Tracks not in any of the languages, if given, and tracks with an excluded Track ID are
+    not processed. Languages may be given as ISO 639-1 or ISO 639-2 codes.
+    """
+    wanted = {LANGUAGES.get(x.lower(), x.lower()) for x in languages} if languages else None
+    skipped = {}
+    for sub in subtitles:
+        if exclude_tracks and sub.track_id in exclude_tracks:
+            skipped[sub.stream_index] = "Excluded"
+        elif wanted is not None and (sub.language or "").lower() not in wanted:
+            skipped[sub.stream_index] = "Not in the chosen languages"
+    return skipped
+
+
+def find_empty_tracks(source: Path, subtitles: list[TextTrack], timeline: TimelineMapper) -> dict[int, str]:
+    """
+    Get the Subtitle tracks without any Caption in the kept segments, by their stream index.
+
+    Only the headers of the Source's Subtitle Blocks are read, so they can be skipped
+    before they are extracted. Which tracks are empty is only known for Matroska Sources,
+    for others, every track is processed and a track found empty once cut is not muxed.
+    """
+    if not subtitles:
+        return {}
+    try:
+        ranges = demux.get_cue_ranges(source, {sub.track_id for sub in subtitles})
+    except (ValueError, OSError):
+        return {}
+    return {
+        sub.stream_index: "No Captions in the kept segments"
+        for sub in subtitles
+        if not any(timeline.keeps(start, end) for start, end in ranges[sub.track_id])
+    }
+
+
+def get_track_table(subtitles: list[TextTrack], skipped: dict[int, str]) -> Table:
+    """Get a table of the Source's Subtitle tracks, and whether each is processed or why it's skipped."""
+    table = Table(title="Subtitle Tracks")
+    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Format", style="magenta")
+    table.add_column("Language")
+    table.add_column("Title")
+    table.add_column("Result")
+    for sub in subtitles:
+        table.add_row(
+            str(sub.track_id),
+            sub.format,
+            sub.language or "",
+            sub.title or "",
+            f"[bold red]-[/] {skipped[sub.stream_index]}" if sub.stream_index in skipped else "[green]Kept[/]"
+        )
+    return table
+
+
+def get_track_ids(tracks: list[dict[str, Any]], subtitles: list[TextTrack]) -> dict[int, int]:
+    """
+    Get the mkvmerge Track ID of each Subtitle track, by stream index.
+
+    Tracks are matched on their number in the container, e.g. the Matroska track number
+    or MPEG-TS PID, as mkvmerge identifies them, see identify(). Subtitles within another
+    track, like EIA-608 captions within the video or Teletext pages, are not tracks of
+    their own to mkvmerge and are left out. Raises a ValueError if the Subtitle tracks
+    otherwise disagree.
+    """
+    numbers = {}
+    for track in tracks:
+        if track["type"] != "subtitles":
+            continue
+        properties = track.get("properties", {})
+        number = properties.get("number", properties.get("stream_id"))
+        if number is None:
+            raise ValueError(f"mkvmerge did not identify the container track number of Track ID {track['id']}")
+        numbers[number] = track["id"]
+
+    track_ids = {}
+    for sub in subtitles:
+        if not isinstance(sub.track_id, int):
+            continue  # e.g. "1-CC1", within another track
+        if sub.track_id not in numbers:
+            raise ValueError(f"mkvmerge did not identify Subtitle track {sub.track_id} as a Subtitle track")
+        track_ids[sub.stream_index] = numbers.pop(sub.track_id)
+    if numbers:
+        raise ValueError(
+            f"mkvmerge identified Subtitle tracks {', '.join(map(str, numbers))} that were not probed"
+        )
+    return track_ids
+
+
+def get_track_options(
+    track_ids: dict[int, int], subtitles: list[TextTrack], original_language: str, offset: int,
+    skipped: Collection[int] = ()
+) -> list[str]:
+    """
+    Get the mkvmerge options of the Subtitle tracks, by their mkvmerge Track IDs, see get_track_ids().
+
+    Subtitles with a skipped stream index are left out by selecting the Track IDs of
+    the others, as only the Subtitle tracks of their own are tracks to mkvmerge.
+    """
+    track_options = []
+    kept_ids = []
+    for sub in sorted(subtitles, key=lambda x: x.stream_index):
+        if sub.stream_index in skipped or sub.stream_index not in track_ids:
+            continue
+        track_id = track_ids[sub.stream_index]
+        kept_ids.append(str(track_id))
+        track_options.extend(["--original-flag", f"{track_id}:{sub.language == original_language}"])
+        if offset:
+            track_options.extend(["--sync", f"{track_id}:{offset}"])
+    if skipped:
+        track_options.extend(["--subtitle-tracks", ",".join(kept_ids)] if kept_ids else ["--no-subtitles"])
+    return track_options
+
+
+def export_with_subtitles(
+    source: Path, out_path: Path, timeline: TimelineMapper, subtitles: list[TextTrack], original_language: str,
+    offset: int, console: AnyConsole, tracer: Optional[Tracer] = None, skipped: Collection[int] = ()
+) -> None:
+    """
+    Export the kept segments of the Source with mkvmerge, cutting its Subtitles in the same pass.
+
+    The Subtitle tracks keep their flags and metadata, and get the initial offset and
+    original language flag. Subtitles are all of the Source's Subtitle tracks, those
+    with a skipped stream index are left out. It's exported to a partial file that
+    replaces out_path.
+    """
+    with trace.span(tracer, "Identify Source", source=str(source)):
+        track_ids = get_track_ids(identify(source), subtitles)
+    track_options = get_track_options(track_ids, subtitles, original_language, offset, skipped)
+
+    partial_file = out_path.with_name(f".{out_path.stem}.partial{out_path.suffix}")
+    # mkvmerge may number the output of a split even if all parts are linked
+    numbered_file = partial_file.with_stem(f"{partial_file.stem}-001")
+    with console.status("Exporting the Cut Video with mkvmerge...") as status:
+        try:
+            run_jobs(
+                [export_cut(source, partial_file, timeline.segments(), track_options)],
+                on_progress=lambda job: status.update(f"Exporting the Cut Video with mkvmerge ({job})..."),
+                tracer=tracer
+            )
+            if not partial_file.exists() and numbered_file.exists():
+                numbered_file.rename(partial_file)
+            os.replace(partial_file, out_path)
+        finally:
+            partial_file.unlink(missing_ok=True)
+            numbered_file.unlink(missing_ok=True)
+
+
+class VideoReDoExporter:
+    """
+    Exports VideoReDo Projects with one VideoReDo instance, kept running between exports.
+
+    COM objects can only be used from the thread that created them, so VideoReDo is
+    started on the exporter's own thread on the first export, and exports are run on
+    it one at a time. VideoReDo only exports one Project at a time either way.
+    """
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="VideoReDo")
+        self._vrd = None
+
+    def submit(
+        self, project: Path, out_path: Path, on_progress: Callable[[float], None], cancel: threading.Event,
+        tracer: Optional[Tracer] = None
+    ) -> Future:
+        """Queue an export, see export_project(). Returns its Future."""
+        return self._pool.submit(self._export, project, out_path, on_progress, cancel, tracer)
+
+    def close(self) -> None:
+        """Wait for queued exports, then exit VideoReDo, if it was started."""
+        self._pool.submit(self._exit).result()
+        self._pool.shutdown()
+
+    def _export(
+        self, project: Path, out_path: Path, on_progress: Callable[[float], None], cancel: threading.Event,
+        tracer: Optional[Tracer]
+    ) -> None:
+        if not self._vrd:
+            from subredo.videoredocom import VideoReDo
+            with trace.span(tracer, "Start VideoReDo", "tool"):
+                self._vrd = VideoReDo()
+        export_project(project, out_path, on_progress, cancel, tracer, self._vrd)
+
+    def _exit(self) -> None:
+        # VideoReDo exits once the instance is deleted, which must be on this thread
+        self._vrd = None
+
+
+def export_project(
+    project: Path, out_path: Path, on_progress: Callable[[float], None], cancel: threading.Event,
+    tracer: Optional[Tracer] = None, vrd: Any = None
+) -> None:
+    """
+    Export a VideoReDo Project to MKV with VideoReDo, waiting for it to finish. Windows only.
+
+    Safe to run in a background thread. The export is aborted if cancel is set. VideoReDo
+    is started for this export, unless a running instance created on the same thread is
+    given, see VideoReDoExporter.
+    """
+    with trace.span(tracer, "VideoReDo Export", "tool"):
+        if not vrd:
+            from subredo.videoredocom import VideoReDo
+            vrd = VideoReDo()
+        if not vrd.file_open(project):
+            raise ValueError(f"Failed to open Project File \"{project}\"")
+        if not vrd.file_save_as(out_path, "Matroska MKV"):
+            raise ValueError(f"Failed to save Video to \"{out_path}\"")
+        while vrd.vrd.OutputGetState != 0:
+            if cancel.is_set():
+                vrd.abort_output()
+            else:
+                on_progress(vrd.output_get_percent_complete)
+            time.sleep(0.2)
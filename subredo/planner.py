@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from subredo.console import Table
+from subredo.timestamp import TICKS_PER_MS, Timestamp
+from subredo.videoredoproject import VideoReDoProject
+
+
+class Plan:
+    """
+    The segments of the Source kept by a Project, and the cuts removed between them.
+
+    Segments and cuts are sorted, non-overlapping (start, end) intervals in ticks. Each
+    segment's offset is where it starts on the Cut timeline.
+    """
+    __slots__ = ("segments", "cuts", "offsets", "kept_duration", "ignored")
+
+    def __init__(self, segments: list[tuple[int, int]], cuts: list[tuple[int, int]], ignored: Iterable[int] = ()):
+        self.segments = segments
+        self.cuts = cuts
+        self.ignored = list(ignored)
+        self.offsets: list[int] = []
+        position = 0
+        for start, end in segments:
+            self.offsets.append(position)
+            position += end - start
+        self.kept_duration = position
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def timestamps(self) -> list[tuple[Timestamp, Timestamp]]:
+        """Get the kept segments as Timestamps, e.g. for a TimelineMapper."""
+        return [(Timestamp(start), Timestamp(end)) for start, end in self.segments]
+
+    def get_table(self) -> Table:
+        """Get a table of the kept segments and the cuts between them, in order."""
+        table = Table(title="Project Segments")
+        table.add_column("#", justify="right", style="cyan", no_wrap=True)
+        table.add_column("Start", style="magenta")
+        table.add_column("End", style="magenta")
+        table.add_column("Difference", justify="right", style="green")
+
+        rows = sorted([(start, end, False) for start, end in self.segments] + [(start, end, True) for start, end in self.cuts])
+        for i, (start, end, is_cut) in enumerate(rows, start=1):
+            a, b = Timestamp(start), Timestamp(end)
+            if is_cut:
+                table.add_row(f"[bold red]-[/] {i}", str(a), str(b), f"-{b - a}")
+            else:
+                table.add_row(f"{i}", str(a), str(b), f"{b - a}")
+        return table
+
+
+def merge(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort intervals and merge those that overlap or touch. Empty intervals are dropped."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def invert(intervals: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    """Get the gaps between merged intervals within start and end."""
+    gaps = []
+    position = start
+    for a, b in intervals:
+        if a > position:
+            gaps.append((position, min(a, end)))
+        position = max(position, b)
+    if position < end:
+        gaps.append((position, end))
+    return [(a, b) for a, b in gaps if b > a]
+
+
+def plan_cuts(cuts: Iterable[tuple[int, int]], duration: int, frame: int = 0, ignored: Iterable[int] = ()) -> Plan:
+    """
+    Plan the segments kept after removing cuts, in any order and possibly overlapping, from a Source.
+
+    Cuts are moved back by one frame, and the segments between them are shrunk by one
+    frame on each side, other than at the end of the Source. Cuts that do not remove
+    more whole milliseconds than a frame rounded up to a whole millisecond, e.g. 40 ms at
+    25 FPS or 34 ms at 29.97 FPS, and segments left empty, are dropped.
+    """
+    min_cut = -(-frame // TICKS_PER_MS)
+    removed = merge(
+        (max(0, start - frame), min(duration, end - frame))
+        for start, end in cuts
+        if end // TICKS_PER_MS - start // TICKS_PER_MS > min_cut
+    )
+    segments = []
+    position = 0
+    for start, end in removed:
+        if start - frame > position + frame:
+            segments.append((position + frame, start - frame))
+        position = end
+    if duration > position + frame:
+        segments.append((position + frame, duration))
+    return Plan(segments, removed, ignored)
+
+
+def get_plan(project: VideoReDoProject, frame_time: Timestamp = Timestamp()) -> Plan:
+    """
+    Plan the segments of the Source kept by a Project, in either Cut or Scene Edit mode.
+
+    In Scene Edit mode, everything between the Project's scenes is cut. Duration-less
+    Cuts, e.g. made over header data, are listed as ignored by their sequence number.
+    Without a frame time, the Cuts or Scenes are taken as they are.
+    """
+    intervals = [(cut.cut_time_start, cut.cut_time_end) for cut in project.cut_list]
+    if project.cut_mode:
+        ignored = [cut.sequence for cut in project.cut_list if cut.cut_time_end <= cut.cut_time_start]
+        cuts = intervals
+    else:
+        ignored = []
+        cuts = invert(merge(intervals), 0, project.duration)
+    return plan_cuts(cuts, project.duration, frame_time.ticks, ignored)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Optional
+
+from subredo import matroska
+
+# Matroska Codec IDs of Subtitle tracks, by the Format name MediaInfo gives them
+CODEC_FORMATS = {
+    "S_TEXT/UTF8": "UTF-8",
+    "S_TEXT/ASCII": "UTF-8",
+    "S_TEXT/SSA": "SSA",
+    "S_TEXT/ASS": "ASS",
+    "S_TEXT/WEBVTT": "WebVTT",
+    "S_TEXT/USF": "USF",
+    "S_HDMV/PGS": "PGS",
+    "S_HDMV/TEXTST": "HDMV TextST",
+    "S_VOBSUB": "VobSub",
+    "S_DVBSUB": "DVB Subtitle",
+    "S_KATE": "Kate",
+    "S_ARIBSUB": "ARIB STD-B24/B37"
+}
+
+# ISO 639-2 (bibliographic and terminology) codes that have an ISO 639-1 code, like MediaInfo reports them
+LANGUAGES = {
+    "aar": "aa", "abk": "ab", "afr": "af", "aka": "ak", "alb": "sq", "amh": "am", "ara": "ar", "arg": "an",
+    "arm": "hy", "asm": "as", "ava": "av", "ave": "ae", "aym": "ay", "aze": "az", "bak": "ba", "bam": "bm",
+    "baq": "eu", "bel": "be", "ben": "bn", "bih": "bh", "bis": "bi", "bod": "bo", "bos": "bs", "bre": "br",
+    "bul": "bg", "bur": "my", "cat": "ca", "ces": "cs", "cha": "ch", "che": "ce", "chi": "zh", "chu": "cu",
+    "chv": "cv", "cor": "kw", "cos": "co", "cre": "cr", "cym": "cy", "cze": "cs", "dan": "da", "deu": "de",
+    "div": "dv", "dut": "nl", "dzo": "dz", "ell": "el", "eng": "en", "epo": "eo", "est": "et", "eus": "eu",
+    "ewe": "ee", "fao": "fo", "fas": "fa", "fij": "fj", "fin": "fi", "fra": "fr", "fre": "fr", "fry": "fy",
+    "ful": "ff", "geo": "ka", "ger": "de", "gla": "gd", "gle": "ga", "glg": "gl", "glv": "gv", "gre": "el",
+    "grn": "gn", "guj": "gu", "hat": "ht", "hau": "ha", "heb": "he", "her": "hz", "hin": "hi", "hmo": "ho",
+    "hrv": "hr", "hun": "hu", "hye": "hy", "ibo": "ig", "ice": "is", "ido": "io", "iii": "ii", "iku": "iu",
+    "ile": "ie", "ina": "ia", "ind": "id", "ipk": "ik", "isl": "is", "ita": "it", "jav": "jv", "jpn": "ja",
+    "kal": "kl", "kan": "kn", "kas": "ks", "kat": "ka", "kau": "kr", "kaz": "kk", "khm": "km", "kik": "ki",
+    "kin": "rw", "kir": "ky", "kom": "kv", "kon": "kg", "kor": "ko", "kua": "kj", "kur": "ku", "lao": "lo",
+    "lat": "la", "lav": "lv", "lim": "li", "lin": "ln", "lit": "lt", "ltz": "lb", "lub": "lu", "lug": "lg",
+    "mac": "mk", "mah": "mh", "mal": "ml", "mao": "mi", "mar": "mr", "may": "ms", "mkd": "mk", "mlg": "mg",
+    "mlt": "mt", "mon": "mn", "mri": "mi", "msa": "ms", "mya": "my", "nau": "na", "nav": "nv", "nbl": "nr",
+    "nde": "nd", "ndo": "ng", "nep": "ne", "nld": "nl", "nno": "nn", "nob": "nb", "nor": "no", "nya": "ny",
+    "oci": "oc", "oji": "oj", "ori": "or", "orm": "om", "oss": "os", "pan": "pa", "per": "fa", "pli": "pi",
+    "pol": "pl", "por": "pt", "pus": "ps", "que": "qu", "roh": "rm", "ron": "ro", "rum": "ro", "run": "rn",
+    "rus": "ru", "sag": "sg", "san": "sa", "sin": "si", "slk": "sk", "slo": "sk", "slv": "sl", "sme": "se",
+    "smo": "sm", "sna": "sn", "snd": "sd", "som": "so", "sot": "st", "spa": "es", "sqi": "sq", "srd": "sc",
+    "srp": "sr", "ssw": "ss", "sun": "su", "swa": "sw", "swe": "sv", "tah": "ty", "tam": "ta", "tat": "tt",
+    "tel": "te", "tgk": "tg", "tgl": "tl", "tha": "th", "tib": "bo", "tir": "ti", "ton": "to", "tsn": "tn",
+    "tso": "ts", "tuk": "tk", "tur": "tr", "twi": "tw", "uig": "ug", "ukr": "uk", "urd": "ur", "uzb": "uz",
+    "ven": "ve", "vie": "vi", "vol": "vo", "wel": "cy", "wln": "wa", "wol": "wo", "xho": "xh", "yid": "yi",
+    "yor": "yo", "zha": "za", "zho": "zh", "zul": "zu"
+}
+
+
+def get_fps(default_duration: int) -> Fraction:
+    """
+    Get the frame rate of a Matroska video track from its default frame duration in nanoseconds.
+
+    The duration is rounded to whole nanoseconds, so the rate is snapped to an NTSC rate,
+    i.e. n*1000/1001, if the duration is one rounded, otherwise to the nearest simple fraction.
+    """
+    ntsc = Fraction(round(Fraction(10 ** 9, default_duration) * Fraction(1001, 1000)) * 1000, 1001)
+    if ntsc and abs(1 / ntsc * 10 ** 9 - default_duration) <= 1:
+        return ntsc
+    return Fraction(10 ** 9, default_duration).limit_denominator(1001)
+
+
+def get_language(code: str) -> str:
+    """
+    Get the ISO 639-1 code of a language if it has one, from an ISO 639-2 or BCP 47 code.
+
+    Only the primary language of a BCP 47 code is kept, e.g. en for en-US, so it matches
+    the codes the Original Language and languages are compared against.
+    """
+    language = code.split("-")[0].lower()
+    return LANGUAGES.get(language, language)
+
+
+class TextTrack:
+    """Summary of a Subtitle track of a Video."""
+    def __init__(
+        self, stream_index: int, track_id: int, format_: str, language: str,
+        title: Optional[str], forced: bool, default: bool
+    ):
+        self.stream_index = stream_index
+        self.track_id = track_id
+        self.format = format_
+        self.language = language
+        self.title = title
+        self.forced = forced
+        self.default = default
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TextTrack:
+        return cls(
+            data["stream_index"], data["track_id"], data["format"], data["language"],
+            data["title"], data["forced"], data["default"]
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stream_index": self.stream_index,
+            "track_id": self.track_id,
+            "format": self.format,
+            "language": self.language,
+            "title": self.title,
+            "forced": self.forced,
+            "default": self.default
+        }
+
+
+class MediaSummary:
+    """Summary of the parts of a Video that matter for applying Cuts to its Subtitles."""
+    def __init__(self, fps: Fraction, text_tracks: list[TextTrack]):
+        self.fps = fps
+        self.text_tracks = text_tracks
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MediaSummary:
+        return cls(
+            Fraction(data["fps"]),
+            [TextTrack.from_dict(x) for x in data["text_tracks"]]
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "fps": str(self.fps),
+            "text_tracks": [x.to_dict() for x in self.text_tracks]
+        }
+
+
+def probe(path: Path) -> MediaSummary:
+    """
+    Get a Summary of the Video's frame rate and Subtitle tracks.
+
+    Matroska files are probed by reading only their headers, other files, or Matroska
+    files without a frame rate, fall back to a full parse with MediaInfo.
+    """
+    try:
+        summary = probe_matroska(path)
+    except (ValueError, OSError):
+        summary = None
+    return summary or probe_mediainfo(path)
+
+
+def probe_matroska(path: Path) -> Optional[MediaSummary]:
+    """Get a Summary of a Matroska file from its Tracks header. Returns None if it has no frame rate."""
+    tracks = matroska.read(path)
+    video_track = next((x for x in tracks if x.type == matroska.TRACK_TYPE_VIDEO), None)
+    if not video_track or not video_track.default_duration:
+        return None
+
+    return MediaSummary(
+        fps=get_fps(video_track.default_duration),
+        text_tracks=[
+            TextTrack(
+                stream_index=i,
+                track_id=track.number,
+                format_=CODEC_FORMATS.get(track.codec_id, track.codec_id),
+                language=get_language(track.language),
+                title=track.name,
+                forced=track.forced,
+                default=track.default
+            )
+            for i, track in enumerate(x for x in tracks if x.type == matroska.TRACK_TYPE_SUBTITLE)
+        ]
+    )
+
+
+def probe_mediainfo(path: Path) -> MediaSummary:
+    """Get a Summary of the Video's frame rate and Subtitle tracks with MediaInfo."""
+    from pymediainfo import MediaInfo  # loads the native MediaInfo library, only do so when needed
+
+    mediainfo = MediaInfo.parse(path)
+    video_track = mediainfo.video_tracks[0]
+
+    return MediaSummary(
+        fps=Fraction(int(video_track.framerate_num), int(video_track.framerate_den)),
+        text_tracks=[
+            TextTrack(
+                stream_index=int(track.stream_identifier),
+                track_id=track.track_id,
+                format_=track.format,
+                language=get_language(track.language) if track.language else track.language,
+                title=track.title,
+                forced=track.forced == "Yes",
+                default=track.default == "Yes"
+            )
+            for track in mediainfo.text_tracks
+        ]
+    )
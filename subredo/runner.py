@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, Optional, Pattern, Sequence, Union
+
+from subredo.trace import Span, Tracer, get_process_usage
+
+
+class Job:
+    """An invocation of an external tool, e.g. FFmpeg or mkvmerge."""
+    def __init__(self, name: str, args: Sequence[Union[str, Path]], progress: Optional[Pattern] = None):
+        self.name = name
+        self.args = [str(x) for x in args]
+        self.progress = progress
+        self.percent: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.stderr = ""
+
+    def __str__(self) -> str:
+        if self.percent is not None:
+            return f"{self.name} ({self.percent:.0f}%)"
+        return self.name
+
+
+class JobError(subprocess.CalledProcessError):
+    """An external tool exited with a non-zero exit code."""
+    def __init__(self, job: Job):
+        super().__init__(job.returncode, job.args, stderr=job.stderr)
+        self.job = job
+
+    def __str__(self) -> str:
+        message = f"{self.job.name} failed with exit code {self.returncode}"
+        if self.stderr:
+            message += f": {self.stderr.strip()}"
+        return message
+
+
+class _Usage:
+    """The last read CPU time and bytes read and written of a running process."""
+    def __init__(self):
+        self.cpu: Optional[float] = None
+        self.io: Optional[tuple[int, int]] = None
+
+    async def sample(self, pid: int, interval: float = 0.1) -> None:
+        while True:
+            cpu, io = get_process_usage(pid)
+            if cpu is None and io is None:
+                return  # exited, or not available on this platform
+            self.cpu, self.io = cpu, io
+            await asyncio.sleep(interval)
+
+
+async def _run_job(
+    job: Job, semaphore: asyncio.Semaphore, on_progress: Callable[[Job], None], tracer: Optional[Tracer] = None
+) -> Job:
+    async with semaphore:
+        start = time.perf_counter()
+        usage = _Usage()
+
+        def add_span(status: Union[int, str]) -> None:
+            if tracer:
+                tracer.add(Span(
+                    job.name,
+                    "tool",
+                    start,
+                    duration=time.perf_counter() - start,
+                    cpu=usage.cpu,
+                    read_bytes=usage.io[0] if usage.io else None,
+                    write_bytes=usage.io[1] if usage.io else None,
+                    status=status,
+                    args={"args": job.args}
+                ))
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *job.args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            add_span(type(e).__name__)
+            raise
+        # a process' usage can only be read while it runs, the last reading is used
+        sampler = asyncio.ensure_future(usage.sample(process.pid)) if tracer else None
+        try:
+            stderr = asyncio.ensure_future(process.stderr.read())
+            buffer = b""
+            while True:
+                chunk = await process.stdout.read(4096)
+                if not chunk:
+                    break
+                # progress lines may be terminated by carriage returns only
+                *lines, buffer = re.split(rb"[\r\n]", buffer + chunk)
+                for line in lines:
+                    match = job.progress and job.progress.search(line.decode("utf8", "replace"))
+                    if match:
+                        job.percent = float(match.group(1))
+                        on_progress(job)
+            job.stderr = (await stderr).decode("utf8", "replace")
+            job.returncode = await process.wait()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        finally:
+            if sampler:
+                sampler.cancel()
+            add_span(process.returncode if process.returncode is not None else "cancelled")
+
+    if job.returncode != 0:
+        raise JobError(job)
+
+    job.percent = 100.0
+    on_progress(job)
+    return job
+
+
+async def run_jobs_async(
+    jobs: Sequence[Job],
+    concurrency: Optional[int] = None,
+    on_progress: Optional[Callable[[Job], None]] = None,
+    tracer: Optional[Tracer] = None
+) -> list[Job]:
+    """
+    Run Jobs concurrently, with at most `concurrency` processes running at once.
+
+    The first Job to fail cancels and kills all other Jobs, and its JobError is
+    raised with the tool's stderr output. Defaults to one process per CPU.
+    Each Job's run, including its exit code, is recorded with the Tracer, if any.
+    """
+    semaphore = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+    tasks = [
+        asyncio.ensure_future(_run_job(job, semaphore, on_progress or (lambda _: None), tracer))
+        for job in jobs
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return list(jobs)
+
+
+def run_jobs(
+    jobs: Sequence[Job],
+    concurrency: Optional[int] = None,
+    on_progress: Optional[Callable[[Job], None]] = None,
+    tracer: Optional[Tracer] = None
+) -> list[Job]:
+    """Run Jobs concurrently, blocking until all are done. See run_jobs_async()."""
+    return asyncio.run(run_jobs_async(jobs, concurrency, on_progress, tracer))
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from subredo.cache import Cache
+from subredo.client import DEFAULT_PORT
+from subredo.console import PlainConsole, Table, strip_markup
+from subredo.pipeline import VideoReDoExporter, process_project
+from subredo.trace import Tracer
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# the options a submission may set for its own Job, over those the server was started with
+JOB_OPTIONS = {
+    "cut_video": (str, type(None)),
+    "original_language": (str,),
+    "keep_cut": (bool,),
+    "offset": (int,),
+    "exporter": (str, type(None))
+}
+
+# amount of the most recent lines of a Job's output that are kept
+LOG_SIZE = 200
+
+JOB_PATH = re.compile(r"^/jobs/(\d+)$")
+
+
+class ServerJob:
+    """A Project submitted to the JobServer, and its status, progress, and output so far."""
+    def __init__(self, id_: int, project: Path, options: dict[str, Any]):
+        self.id = id_
+        self.project = project
+        self.options = options
+        self.status = QUEUED
+        self.progress: Optional[str] = None
+        self.log: deque[str] = deque(maxlen=LOG_SIZE)
+        self.output: Optional[Path] = None
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def to_dict(self, log: bool = False) -> dict[str, Any]:
+        """Get the Job as JSON-serializable data, with its output log if log."""
+        data = {
+            "id": self.id,
+            "project": str(self.project),
+            "options": self.options,
+            "status": self.status,
+            "progress": self.progress,
+            "output": str(self.output) if self.output else None,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished
+        }
+        if log:
+            data["log"] = list(self.log)
+        return data
+
+
+class _JobStatus:
+    def __init__(self, job: ServerJob):
+        self.job = job
+
+    def update(self, status: str) -> None:
+        self.job.progress = strip_markup(status)
+
+
+class JobConsole(PlainConsole):
+    """A Console recording what's printed to a Job's log, and its current status as the Job's progress."""
+    def __init__(self, job: ServerJob):
+        super().__init__()
+        self.job = job
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", markup: Optional[bool] = None) -> None:
+        text = sep.join(str(x) if isinstance(x, Table) or markup is False else strip_markup(str(x)) for x in objects)
+        self.job.log.extend(text.splitlines())
+
+    @contextmanager
+    def status(self, status: str) -> Iterator[_JobStatus]:
+        previous = self.job.progress
+        job_status = _JobStatus(self.job)
+        job_status.update(status)
+        try:
+            yield job_status
+        finally:
+            self.job.progress = previous
+
+
+def get_job_options(data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the Job options of a submission. Raises a ValueError if any is unknown or invalid."""
+    options = {}
+    for name, value in data.items():
+        if name not in JOB_OPTIONS:
+            raise ValueError(f"Unknown option \"{name}\"")
+        if not isinstance(value, JOB_OPTIONS[name]) or (isinstance(value, bool) and bool not in JOB_OPTIONS[name]):
+            raise ValueError(f"Invalid value for option \"{name}\": {value!r}")
+        options[name] = value
+    if options.get("exporter") not in (None, "videoredo", "mkvmerge"):
+        raise ValueError(f"Unknown exporter \"{options['exporter']}\"")
+    if options.get("offset", 0) < 0:
+        raise ValueError("The offset must be 0 or greater")
+    if options.get("cut_video") and not Path(options["cut_video"]).is_absolute():
+        raise ValueError("The Cut Video path must be absolute")
+    return options
+
+
+class JobServer:
+    """
+    Processes Projects submitted over HTTP on a local port, keeping state warm between them.
+
+    Submitted Projects are queued as Jobs, and processed in order by `workers` threads,
+    so at most that many are processed at once. Everything a Project needs is loaded
+    once for all of them, i.e. the modules, the Cache, and VideoReDo, which is kept
+    running instead of being started for every Project.
+
+    The HTTP API takes and returns JSON:
+
+    POST /jobs          Submit a Project, {"project": "/path/to.Vprj", ...Job options}.
+    GET /jobs           List all Jobs.
+    GET /jobs/<id>      Get a Job, with the most recent lines of its output.
+    DELETE /jobs/<id>   Cancel a Job that did not start yet.
+
+    Jobs are kept in memory only, and forgotten when the server stops.
+    """
+    def __init__(
+        self, host: str = "127.0.0.1", port: Optional[int] = None, workers: int = 1, cache: Optional[Cache] = None,
+        tracer: Optional[Tracer] = None, on_done: Optional[Callable[[ServerJob], None]] = None, **options: Any
+    ):
+        self.workers = workers
+        self.cache = cache
+        self.tracer = tracer
+        self.on_done = on_done
+        self.options = options
+        self.videoredo = VideoReDoExporter()
+        self.jobs: dict[int, ServerJob] = {}
+        self._queue: queue.Queue[Optional[ServerJob]] = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running = 0
+        self.httpd = ThreadingHTTPServer((host, DEFAULT_PORT if port is None else port), _Handler)
+        self.httpd.job_server = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, project: Path, **options: Any) -> ServerJob:
+        """Queue a Project to be processed. Raises a ValueError if the Project or an option is invalid."""
+        if not project.is_absolute():
+            raise ValueError("The Project path must be absolute")
+        if not project.is_file():
+            raise ValueError(f"The Project \"{project}\" does not exist")
+        options = get_job_options(options)
+        with self._lock:
+            job = ServerJob(next(self._ids), project, options)
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def cancel(self, id_: int) -> bool:
+        """Cancel a queued Job. Returns False if it already started."""
+        with self._lock:
+            job = self.jobs[id_]
+            if job.status != QUEUED:
+                return False
+            job.status = CANCELLED
+            job.finished = time.time()
+            return True
+
+    def serve_forever(self) -> None:
+        """
+        Process submitted Projects until interrupted, e.g. by Ctrl+C or shutdown().
+
+        Queued Jobs are cancelled when stopping, but running Jobs are waited for.
+        """
+        threads = [
+            threading.Thread(target=self._work, name=f"Job Worker {i + 1}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            for id_ in list(self.jobs):
+                self.cancel(id_)
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+            self.videoredo.close()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever(), from another thread."""
+        self.httpd.shutdown()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.started = time.time()
+                self._running += 1
+
+            try:
+                options = {"cut_video": None, **self.options, **job.options}
+                if options["cut_video"]:
+                    options["cut_video"] = Path(options["cut_video"])
+                job.output = process_project(
+                    job.project, cache=self.cache, tracer=self.tracer, console=JobConsole(job),
+                    videoredo=self.videoredo, **options
+                )
+                job.status = DONE
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = FAILED
+
+            with self._lock:
+                job.progress = None
+                job.finished = time.time()
+                self._running -= 1
+                # only evicted when idle, so no running Job loses the Cache entries it uses
+                if self.cache and not self._running and self._queue.empty():
+                    self.cache.evict()
+                if self.on_done:
+                    self.on_done(job)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: Any
+
+    def do_GET(self) -> None:
+        job_server: JobServer = self.server.job_server
+        if self.path == "/jobs":
+            self._send(HTTPStatus.OK, [job.to_dict() for job in list(job_server.jobs.values())])
+            return
+        job = self._get_job()
+        if job:
+            self._send(HTTPStatus.OK, job.to_dict(log=True))
+
+    def do_POST(self) -> None:
+        job_server: JobServer = self.server.job_server
+        if self.path != "/jobs":
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path \"{self.path}\""})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if not isinstance(data, dict) or not isinstance(data.get("project"), str):
+                raise ValueError("A Project path is required")
+            job = job_server.submit(Path(data.pop("project")), **data)
+        except ValueError as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        self._send(HTTPStatus.CREATED, job.to_dict())
+
+    def do_DELETE(self) -> None:
+        job_server: JobServer = self.server.job_server
+        job = self._get_job()
+        if not job:
+            return
+        if not job_server.cancel(job.id):
+            self._send(HTTPStatus.CONFLICT, {"error": f"Job {job.id} is already {job.status}"})
+            return
+        self._send(HTTPStatus.OK, job.to_dict())
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # the server reports Jobs, not every request
+
+    def _get_job(self) -> Optional[ServerJob]:
+        match = JOB_PATH.match(self.path)
+        if not match:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path \"{self.path}\""})
+            return None
+        job = self.server.job_server.jobs.get(int(match.group(1)))
+        if not job:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown Job {match.group(1)}"})
+        return job
+
+    def _send(self, status: HTTPStatus, data: Any) -> None:
+        body = json.dumps(data).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import Timestamp
+
+TIMING = re.compile(r"(\d+:\d{2}:\d{2}[,.]\d{1,3})\s*-->\s*(\d+:\d{2}:\d{2}[,.]\d{1,3})")
+
+
+class Cue:
+    """A single SubRip Caption."""
+    def __init__(self, index: int, start: Timestamp, end: Timestamp, text: str):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __str__(self) -> str:
+        start = str(self.start).replace(".", ",")
+        end = str(self.end).replace(".", ",")
+        return f"{self.index}\n{start} --> {end}\n{self.text}\n"
+
+
+def _parse_block(lines: list[str], index: int) -> Optional[Cue]:
+    for i, line in enumerate(lines[:2]):
+        match = TIMING.match(line.strip())
+        if match:
+            return Cue(
+                index=index,
+                start=Timestamp.load(match.group(1)),
+                end=Timestamp.load(match.group(2)),
+                text="\n".join(lines[i + 1:])
+            )
+    return None
+
+
+def iter_cues(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    Parse SubRip (SRT) lines into Cues, one Cue at a time.
+
+    Only the lines of the current Cue are held in memory, so any iterable of lines,
+    like an open file, can be streamed through. Blocks without a valid timing line
+    are skipped. Cue indexes are not trusted and are re-numbered in the order the
+    cues appear.
+    """
+    index = 0
+    block: list[str] = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+            continue
+        if block:
+            cue = _parse_block(block, index + 1)
+            if cue:
+                index += 1
+                yield cue
+            block = []
+    if block:
+        cue = _parse_block(block, index + 1)
+        if cue:
+            yield cue
+
+
+def read(path: Path) -> Iterator[Cue]:
+    """Stream the Cues of a SubRip (SRT) file. A UTF-8 Byte-Order-Mark is ignored."""
+    with open(path, encoding="utf-8-sig") as f:
+        yield from iter_cues(f)
+
+
+def parse(data: str) -> list[Cue]:
+    """Parse SubRip (SRT) data into a list of Cues."""
+    return list(iter_cues(data.splitlines()))
+
+
+def write(path: Path, cues: Iterable[Cue]) -> int:
+    """
+    Stream Cues to a SubRip (SRT) file as UTF-8 (no BOM).
+
+    The file is only created once the first Cue arrives, so nothing is written if
+    there are no Cues. Returns the amount of Cues written.
+    """
+    count = 0
+    f = None
+    try:
+        for cue in cues:
+            if f is None:
+                f = open(path, "w", encoding="utf8")
+            else:
+                f.write("\n")
+            f.write(str(cue))
+            count += 1
+    finally:
+        if f is not None:
+            f.close()
+    return count
+
+
+def dumps(cues: Iterable[Cue]) -> str:
+    """Serialize Cues to SubRip (SRT) data."""
+    return "\n".join(str(cue) for cue in cues)
+
+
+def cut(cues: Iterable[Cue], timeline: TimelineMapper) -> Iterator[Cue]:
+    """
+    Apply Cuts to the Cues, keeping only what's within the kept segments.
+
+    Cues are moved to their position on the Cut timeline. Cues overlapping a
+    segment boundary are trimmed to the boundary, and a Cue spanning a cut is
+    split into one Cue per kept segment. The resulting Cues are re-numbered.
+
+    Cues are processed one at a time as they are consumed, in the order they are
+    given. As the Cut timeline keeps the order of the Source, Cues in time order
+    come out in segment order, ready to be streamed to the final file.
+    """
+    index = 0
+    for cue in cues:
+        for start, end in timeline.map_range(cue.start, cue.end):
+            index += 1
+            yield Cue(
+                index=index,
+                start=start,
+                end=end,
+                text=cue.text
+            )
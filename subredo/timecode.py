@@ -1,19 +1,34 @@
-from __future__ import annotations
-
-
-class Timecode:
-    def __init__(self, hours: int, minutes: int, seconds: int, frame: int):
-        self.hours = hours
-        self.minutes = minutes
-        self.seconds = seconds
-        self.frame = frame
-
-    def __str__(self) -> str:
-        return f"{self.hours:02}:{self.minutes:02}:{self.seconds:02};{self.frame:02}"
-
-    @classmethod
-    def load(cls, value: str) -> Timecode:
-        time, frame = value.split(";")
-        hours, minutes, seconds = map(int, time.split(":"))
-        frame = int(frame)
-        return cls(hours, minutes, seconds, frame)
+from __future__ import annotations
+
+
+class Timecode:
+    __slots__ = ("hours", "minutes", "seconds", "frame")
+
+    def __init__(self, hours: int, minutes: int, seconds: int, frame: int):
+        self.hours = hours
+        self.minutes = minutes
+        self.seconds = seconds
+        self.frame = frame
+
+    def __str__(self) -> str:
+        return f"{self.hours:02}:{self.minutes:02}:{self.seconds:02};{self.frame:02}"
+
+    def __hash__(self) -> int:
+        return hash((self.hours, self.minutes, self.seconds, self.frame))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Timecode):
+            return NotImplemented
+        return (self.hours, self.minutes, self.seconds, self.frame) == \
+            (other.hours, other.minutes, other.seconds, other.frame)
+
+    @classmethod
+    def load(cls, value: str) -> Timecode:
+        time, frame = value.split(";")
+        hours, minutes, seconds = map(int, time.split(":"))
+        frame = int(frame)
+        return cls(hours, minutes, seconds, frame)
+
+    def total_seconds(self) -> int:
+        """Get the whole seconds of the Timecode, not including the frame."""
+        return self.hours * 3600 + self.minutes * 60 + self.seconds
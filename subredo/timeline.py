@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional
+
+from subredo.timestamp import Timestamp
+from subredo.videoredoproject import ChapterMarker
+
+
+class TimelineMapper:
+    """
+    Map Timestamps on the Source timeline to their position on the Cut timeline.
+
+    The kept segments are stored as flat, sorted arrays of tick values, with
+    the cumulative position each segment starts at on the Cut timeline. Single
+    lookups are O(log n) with bisect, while batched lookups with map_many() walk
+    the segments alongside the input and only bisect when the input jumps.
+    """
+    def __init__(self, segments: Iterable[tuple[Timestamp, Timestamp]], offset: Optional[Timestamp] = None):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.offsets = array("q")
+
+        position = offset.ticks if offset else 0
+        for a, b in sorted(segments, key=lambda x: x[0]):
+            a, b = a.ticks, b.ticks
+            if b <= a:
+                continue
+            self.starts.append(a)
+            self.ends.append(b)
+            self.offsets.append(position)
+            position += b - a
+
+        self.end = position
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> Timestamp:
+        """Get the total duration of the Cut timeline, including the initial offset."""
+        return Timestamp(self.end)
+
+    def _find(self, ticks: int) -> int:
+        """Get the index of the last segment starting at or before ticks, or -1 if there isn't one."""
+        return bisect_right(self.starts, ticks) - 1
+
+    def map(self, timestamp: Timestamp) -> Optional[Timestamp]:
+        """Get the position of a Source Timestamp on the Cut timeline, or None if it was cut out."""
+        ticks = timestamp.ticks
+        i = self._find(ticks)
+        if i < 0 or ticks >= self.ends[i]:
+            return None
+        return Timestamp(self.offsets[i] + ticks - self.starts[i])
+
+    def clamp(self, timestamp: Timestamp) -> Timestamp:
+        """
+        Get the position of a Source Timestamp on the Cut timeline, like map().
+
+        Timestamps that were cut out are moved to where their cut is on the Cut
+        timeline, i.e. the start of the next kept segment, or the end.
+        """
+        ticks = timestamp.ticks
+        i = self._find(ticks)
+        if i >= 0 and ticks < self.ends[i]:
+            return Timestamp(self.offsets[i] + ticks - self.starts[i])
+        if i + 1 < len(self.starts):
+            return Timestamp(self.offsets[i + 1])
+        return Timestamp(self.end)
+
+    def segments(self) -> list[tuple[Timestamp, Timestamp]]:
+        """Get the kept segments on the Source timeline, in order."""
+        return [(Timestamp(a), Timestamp(b)) for a, b in zip(self.starts, self.ends)]
+
+    def map_many(self, values: Iterable[int]) -> array:
+        """
+        Map many Source tick values to the Cut timeline in one call.
+
+        Values that were cut out are mapped to -1. Sorted input, like the start
+        times of a Subtitle's cues, is mapped in a single linear walk.
+        """
+        starts, ends, offsets = self.starts, self.ends, self.offsets
+        count = len(starts)
+        result = array("q")
+        i = -1
+        for ticks in values:
+            if i < 0 or ticks < starts[i] or (i + 1 < count and ticks >= starts[i + 1]):
+                i = self._find(ticks)
+            if i < 0 or ticks >= ends[i]:
+                result.append(-1)
+            else:
+                result.append(offsets[i] + ticks - starts[i])
+        return result
+
+    def map_range(self, start: Timestamp, end: Timestamp) -> Iterator[tuple[Timestamp, Timestamp]]:
+        """
+        Map a Source time range to the Cut timeline.
+
+        A range spanning one or more cuts yields one trimmed range per kept segment
+        it overlaps. Nothing is yielded if the whole range was cut out.
+        """
+        for a, b in self.map_range_ticks(start.ticks, end.ticks):
+            yield Timestamp(a), Timestamp(b)
+
+    def map_range_ticks(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Map a Source time range in ticks to the Cut timeline, like map_range(), without any Timestamps."""
+        starts, ends, offsets = self.starts, self.ends, self.offsets
+        i = max(self._find(start), 0)
+        while i < len(starts) and starts[i] < end:
+            a, b = max(start, starts[i]), min(end, ends[i])
+            if a < b:
+                yield offsets[i] + a - starts[i], offsets[i] + b - starts[i]
+            i += 1
+
+    def keeps(self, start: int, end: int) -> bool:
+        """Whether any part of a Source time range in ticks is within the kept segments."""
+        return next(self.map_range_ticks(start, end), None) is not None
+
+    def map_chapters(self, chapters: Iterable[ChapterMarker]) -> list[Timestamp]:
+        """Get the Cut timeline position of each Chapter Marker that wasn't cut out."""
+        mapped = self.map_many(chapter.value for chapter in chapters)
+        return [Timestamp(ticks) for ticks in sorted(mapped) if ticks >= 0]
@@ -1,80 +1,106 @@
-from __future__ import annotations
-
-import math
-from typing import Union
-
-from subredo.timecode import Timecode
-
-
-class Timestamp:
-    def __init__(self, hours: int, minutes: int, seconds: int, ms: Union[int, float]):
-        self.hours = hours
-        self.minutes = minutes
-        self.seconds = seconds
-        self.ms = ms
-
-    def __str__(self) -> str:
-        return f"{self.hours:02}:{self.minutes:02}:{self.seconds:02}.{int(self.ms):0>3}"
-
-    def __lt__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() < other.total_milliseconds()
-
-    def __le__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() <= other.total_milliseconds()
-
-    def __gt__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() > other.total_milliseconds()
-
-    def __ge__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() >= other.total_milliseconds()
-
-    def __eq__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() == other.total_milliseconds()
-
-    def __ne__(self, other: Timestamp) -> bool:
-        return self.total_milliseconds() != other.total_milliseconds()
-
-    def __add__(self, other: Union[Timestamp, int, float]) -> Timestamp:
-        total_ms = self.total_milliseconds()
-        if isinstance(other, Timestamp):
-            total_ms += other.total_milliseconds()
-        else:
-            total_ms += other
-        return self.from_milliseconds(total_ms)
-
-    def __sub__(self, other: Union[Timestamp, int, float]) -> Timestamp:
-        total_ms = self.total_milliseconds()
-        if isinstance(other, Timestamp):
-            total_ms -= other.total_milliseconds()
-        else:
-            total_ms -= other
-        return self.from_milliseconds(max(0, total_ms))
-
-    @classmethod
-    def load(cls, value: str) -> Timestamp:
-        time, ms = value.split(".")
-        hours, minutes, seconds = map(int, time.split(":"))
-        ms = float(f"0.{ms}") * 1000
-        return cls(hours, minutes, seconds, ms)
-
-    @classmethod
-    def from_timecode(cls, timecode: Timecode, fps: Union[int, float]):
-        frame_time_ms = 1000 / fps
-        ms = frame_time_ms * timecode.frame
-        return cls(timecode.hours, timecode.minutes, timecode.seconds, ms)
-
-    @classmethod
-    def from_milliseconds(cls, total_ms: Union[int, float]) -> Timestamp:
-        hours, remainder = divmod(total_ms, 3600000)
-        minutes, remainder = divmod(remainder, 60000)
-        seconds, ms = divmod(remainder, 1000)
-        hours, minutes, seconds = int(hours), int(minutes), int(seconds)
-        return cls(hours, minutes, seconds, ms)
-
-    def total_milliseconds(self) -> int:
-        return math.floor(
-            self.hours * 3600000 +
-            self.minutes * 60000 +
-            self.seconds * 1000 +
-            self.ms
-        )
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Union
+
+from subredo.timecode import Timecode
+
+TICKS_PER_MS = 10000
+TICKS_PER_SECOND = 1000 * TICKS_PER_MS
+
+
+class Timestamp:
+    """
+    A point in time, or a duration, stored as an integer count of 100 ns ticks.
+
+    Ticks are VideoReDo's native time unit, so Project values convert losslessly.
+    Hours, minutes, seconds and milliseconds are only derived when needed. Adding
+    or subtracting plain numbers treats them as milliseconds.
+    """
+    __slots__ = ("ticks",)
+
+    def __init__(self, ticks: int = 0):
+        self.ticks = ticks
+
+    def __str__(self) -> str:
+        return f"{self.hours:02}:{self.minutes:02}:{self.seconds:02}.{self.ms:0>3}"
+
+    def __repr__(self) -> str:
+        return f"Timestamp({self.ticks})"
+
+    def __hash__(self) -> int:
+        return hash(self.ticks)
+
+    def __lt__(self, other: Timestamp) -> bool:
+        return self.ticks < other.ticks
+
+    def __le__(self, other: Timestamp) -> bool:
+        return self.ticks <= other.ticks
+
+    def __gt__(self, other: Timestamp) -> bool:
+        return self.ticks > other.ticks
+
+    def __ge__(self, other: Timestamp) -> bool:
+        return self.ticks >= other.ticks
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self.ticks == other.ticks
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self.ticks != other.ticks
+
+    def __add__(self, other: Union[Timestamp, int, float]) -> Timestamp:
+        if isinstance(other, Timestamp):
+            return Timestamp(self.ticks + other.ticks)
+        return Timestamp(self.ticks + round(other * TICKS_PER_MS))
+
+    def __sub__(self, other: Union[Timestamp, int, float]) -> Timestamp:
+        if isinstance(other, Timestamp):
+            ticks = self.ticks - other.ticks
+        else:
+            ticks = self.ticks - round(other * TICKS_PER_MS)
+        return Timestamp(max(0, ticks))
+
+    @property
+    def hours(self) -> int:
+        return self.ticks // (3600 * TICKS_PER_SECOND)
+
+    @property
+    def minutes(self) -> int:
+        return self.ticks // (60 * TICKS_PER_SECOND) % 60
+
+    @property
+    def seconds(self) -> int:
+        return self.ticks // TICKS_PER_SECOND % 60
+
+    @property
+    def ms(self) -> int:
+        return self.ticks // TICKS_PER_MS % 1000
+
+    @classmethod
+    def load(cls, value: str) -> Timestamp:
+        time, fraction = value.replace(",", ".").split(".")
+        hours, minutes, seconds = map(int, time.split(":"))
+        ticks = (hours * 3600 + minutes * 60 + seconds) * TICKS_PER_SECOND
+        ticks += int(fraction.ljust(7, "0")[:7])
+        return cls(ticks)
+
+    @classmethod
+    def from_timecode(cls, timecode: Timecode, fps: Union[Fraction, int, float]) -> Timestamp:
+        return cls(timecode.total_seconds() * TICKS_PER_SECOND) + cls.from_frames(timecode.frame, fps)
+
+    @classmethod
+    def from_frames(cls, frames: int, fps: Union[Fraction, int, float]) -> Timestamp:
+        """Get the duration of a number of frames, rounded to the nearest tick."""
+        return cls(round(frames * TICKS_PER_SECOND / Fraction(fps)))
+
+    @classmethod
+    def from_milliseconds(cls, total_ms: Union[int, float]) -> Timestamp:
+        return cls(round(total_ms * TICKS_PER_MS))
+
+    def total_milliseconds(self) -> int:
+        return self.ticks // TICKS_PER_MS
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator, Optional, Union
+
+from subredo.console import Table
+
+
+def get_cpu_time() -> float:
+    """Get the CPU time used by this process and its waited for child processes, in seconds."""
+    return sum(os.times()[:4])
+
+
+def get_process_usage(pid: Union[int, str] = "self") -> tuple[Optional[float], Optional[tuple[int, int]]]:
+    """
+    Get the CPU time in seconds, and bytes read and written, of a process so far.
+
+    Either is None if unavailable, which is always the case for other processes when not
+    on Linux. Bytes are counted as read and written by the process, including the page
+    cache and pipes, not only what reached the disk.
+    """
+    cpu = None
+    if pid == "self":
+        cpu = get_cpu_time()
+    else:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # the process name may contain spaces, the fields after it can be split
+                fields = f.read().rsplit(")", maxsplit=1)[1].split()
+            cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (OSError, IndexError, ValueError):
+            pass
+
+    io = None
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            counters = dict(line.split(": ", maxsplit=1) for line in f.read().splitlines())
+        io = (int(counters["rchar"]), int(counters["wchar"]))
+    except (OSError, KeyError, ValueError):
+        pass
+
+    return cpu, io
+
+
+class Span:
+    """A timed stage of processing, or run of an external tool, as recorded by a Tracer."""
+    __slots__ = (
+        "name", "category", "start", "duration", "cpu", "read_bytes", "write_bytes", "status", "pid", "tid", "thread",
+        "args"
+    )
+
+    def __init__(
+        self, name: str, category: str, start: float, duration: float = 0.0, cpu: Optional[float] = None,
+        read_bytes: Optional[int] = None, write_bytes: Optional[int] = None, status: Union[int, str, None] = None,
+        args: Optional[dict[str, Any]] = None
+    ):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = duration
+        self.cpu = cpu
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.status = status
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.thread = threading.current_thread().name
+        self.args = args or {}
+
+    def to_event(self, origin: float) -> dict[str, Any]:
+        """Get the Span as a Chrome trace complete event, with times relative to origin."""
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": round((self.start - origin) * 1_000_000, 3),
+            "dur": round(self.duration * 1_000_000, 3),
+            "pid": self.pid,
+            "tid": self.tid,
+            "args": {
+                **self.args,
+                "cpu_ms": round(self.cpu * 1000, 3) if self.cpu is not None else None,
+                "read_bytes": self.read_bytes,
+                "write_bytes": self.write_bytes,
+                "status": self.status
+            }
+        }
+
+
+class Tracer:
+    """
+    Records Spans of the stages of processing and every external tool run.
+
+    Stages record their wall time, and the CPU time and bytes read and written by the
+    whole process, including any tool it waited for, during the stage. Tools record
+    their own, as last seen before they exited. Spans from other processes, e.g. Batch
+    mode workers, can be added, as times are taken from the system-wide performance
+    counter.
+
+    The Spans can be written in the Chrome trace event format, to be viewed in
+    chrome://tracing or Perfetto.
+    """
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, *spans: Span) -> None:
+        """Add Spans, from any thread."""
+        with self._lock:
+            self.spans.extend(spans)
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args: Any) -> Iterator[Span]:
+        """Record a Span of the code in the with block. Its status is "ok", or the name of the raised exception."""
+        cpu, io = get_process_usage()
+        span = Span(name, category, time.perf_counter(), status="ok", args=args)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            cpu_end, io_end = get_process_usage()
+            span.cpu = cpu_end - cpu
+            if io and io_end:
+                span.read_bytes = io_end[0] - io[0]
+                span.write_bytes = io_end[1] - io[1]
+            self.add(span)
+
+    def to_chrome(self) -> dict[str, Any]:
+        """Get the Spans as a Chrome trace, starting at the earliest Span."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda x: x.start)
+        origin = spans[0].start if spans else 0.0
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+            for pid, tid, thread in sorted({(x.pid, x.tid, x.thread) for x in spans})
+        ]
+        events.extend(span.to_event(origin) for span in spans)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> None:
+        """Write the Spans to a Chrome trace JSON file."""
+        path.write_text(json.dumps(self.to_chrome()), encoding="utf8")
+
+    def get_summary(self, limit: int = 10) -> Table:
+        """Get a table of the slowest stages and tools, by their total wall time over all Spans of the same name."""
+        with self._lock:
+            spans = list(self.spans)
+
+        totals: dict[tuple[str, str], list[Any]] = {}
+        for span in spans:
+            total = totals.setdefault((span.category, span.name), [0, 0.0, 0.0, 0, 0, 0])
+            total[0] += 1
+            total[1] += span.duration
+            total[2] += span.cpu or 0.0
+            total[3] += span.read_bytes or 0
+            total[4] += span.write_bytes or 0
+            if span.status not in ("ok", 0):
+                total[5] += 1
+
+        table = Table(title="Slowest Stages")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Kind", style="magenta")
+        table.add_column("Count", justify="right")
+        table.add_column("Wall", justify="right", style="green")
+        table.add_column("CPU", justify="right")
+        table.add_column("Read", justify="right")
+        table.add_column("Written", justify="right")
+        table.add_column("Failed", justify="right")
+        for (category, name), (count, wall, cpu, read, written, failed) in sorted(
+            totals.items(), key=lambda x: x[1][1], reverse=True
+        )[:limit]:
+            table.add_row(
+                name, category, str(count), f"{wall:.3f}s", f"{cpu:.3f}s", get_size(read), get_size(written),
+                f"[bold red]{failed}[/]" if failed else "0"
+            )
+        return table
+
+
+def get_size(size: int) -> str:
+    """Get a human-readable size, e.g. 1.5 MiB."""
+    if size < 1024:
+        return f"{size} B"
+    value = float(size)
+    for unit in ("KiB", "MiB", "GiB"):
+        value /= 1024
+        if value < 1024:
+            break
+    return f"{value:.1f} {unit}"
+
+
+def span(tracer: Optional[Tracer], name: str, category: str = "stage", **args: Any) -> ContextManager[Optional[Span]]:
+    """Record a Span with the Tracer, if there is one."""
+    if tracer:
+        return tracer.span(name, category, **args)
+    return nullcontext()
+
+
+def call_traced(
+    func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> tuple[Any, Optional[Exception], list[Span]]:
+    """
+    Call a function with a new Tracer as its `tracer` argument, e.g. in a worker process.
+
+    Returns the function's result or raised exception, and the recorded Spans, so they
+    are available even if it failed.
+    """
+    tracer = Tracer()
+    try:
+        return func(*args, tracer=tracer, **kwargs), None, tracer.spans
+    except Exception as e:
+        return None, e, tracer.spans
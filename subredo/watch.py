@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import platform
+import re
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from subredo.videoredoproject import VideoReDoProject
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# changes made by other machines to these are not seen by inotify
+NETWORK_FILESYSTEMS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre", "davfs",
+    "fuse.sshfs", "fuse.rclone", "fuse.glusterfs", "fuse.cephfs", "fuse.s3fs"
+})
+
+
+def get_fingerprint(project: VideoReDoProject, options: dict[str, Any]) -> str:
+    """
+    Get a fingerprint of everything that affects the output of processing a Project.
+
+    That is the cuts, the Source file's identity, and the options. Anything else in
+    the Project, like the time it was saved, is ignored.
+    """
+    hash_ = hashlib.blake2b(digest_size=20)
+    hash_.update(f"{project.filename}\0{project.duration}\0{project.cut_mode}\0".encode("utf8"))
+    for cut in project.cut_list:
+        hash_.update(f"{cut.cut_time_start}-{cut.cut_time_end}\0".encode("utf8"))
+    try:
+        stat = project.filename.stat()
+        hash_.update(f"{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf8"))
+    except OSError:
+        pass
+    hash_.update(repr(sorted(options.items())).encode("utf8"))
+    return hash_.hexdigest()
+
+
+def get_filesystem(path: Path) -> Optional[str]:
+    """Get the type of the filesystem a path is on, e.g. ext4 or nfs4, None if unknown or not on Linux."""
+    try:
+        with open("/proc/self/mountinfo", encoding="utf8", errors="surrogateescape") as f:
+            mounts = f.read().splitlines()
+        path = path.resolve()
+    except OSError:
+        return None
+    fstype = None
+    longest = -1
+    for line in mounts:
+        fields, _, rest = line.partition(" - ")
+        fields, rest = fields.split(), rest.split()
+        if len(fields) < 5 or not rest:
+            continue
+        # spaces and such in the mount point are escaped as octal, e.g. \040
+        mount_point = Path(re.sub(r"\\([0-7]{3})", lambda x: chr(int(x.group(1), 8)), fields[4]))
+        # the last mount at the longest mount point containing the path is the one in effect
+        depth = len(mount_point.parts)
+        if depth >= longest and (mount_point == path or mount_point in path.parents):
+            fstype = rest[0]
+            longest = depth
+    return fstype
+
+
+class Watcher:
+    """
+    Watch a folder for new or modified Project files.
+
+    Iterating the Watcher blocks, yielding each Project file once it has been left
+    unchanged for the debounce period, so repeated saves only yield it once. On
+    Linux, inotify is used so nothing is read until a file is written to. On other
+    systems, on network filesystems like SMB or NFS, where inotify only sees the
+    changes made by this machine, or when polling is requested, the folder is
+    scanned every interval and files are compared by modification time and size.
+    """
+    def __init__(
+        self, folder: Path, suffix: str = ".vprj", debounce: float = 2.0, interval: float = 1.0,
+        poll: bool = False, existing: bool = False
+    ):
+        self.folder = folder
+        self.suffix = suffix.lower()
+        self.debounce = debounce
+        self.interval = interval
+        self.existing = existing
+
+        self._fd: Optional[int] = None
+        if not poll and platform.system() == "Linux" and get_filesystem(folder) not in NETWORK_FILESYSTEMS:
+            self._fd = self._inotify_init()
+        self._snapshot = self._scan()
+
+    @property
+    def polling(self) -> bool:
+        """If the folder is polled for changes, rather than watched with inotify."""
+        return self._fd is None
+
+    def _inotify_init(self) -> Optional[int]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(self.folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(self.suffix) and entry.is_file():
+                    stat = entry.stat()
+                    snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _wait(self, timeout: float) -> set[Path]:
+        """Wait up to timeout seconds for changes, returning the Project files that changed."""
+        if self._fd is not None:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                return set()
+            data = os.read(self._fd, 64 * 1024)
+            changed = set()
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf8", "surrogateescape")
+                offset += length
+                if name.lower().endswith(self.suffix):
+                    changed.add(self.folder / name)
+            return changed
+
+        time.sleep(timeout)
+        snapshot = self._scan()
+        changed = {
+            path
+            for path, stat in snapshot.items()
+            if self._snapshot.get(path) != stat
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def __iter__(self) -> Iterator[Path]:
+        pending: dict[Path, float] = {}
+        if self.existing:
+            pending = {path: time.monotonic() for path in self._snapshot}
+
+        try:
+            while True:
+                now = time.monotonic()
+                for path, due in sorted(pending.items(), key=lambda x: x[1]):
+                    if due > now:
+                        break
+                    del pending[path]
+                    if path.is_file():
+                        yield path
+
+                now = time.monotonic()
+                timeout = self.interval
+                if pending:
+                    timeout = min(timeout, max(0.0, min(pending.values()) - now))
+
+                for path in self._wait(timeout):
+                    # every change pushes the deadline back, debouncing repeated saves
+                    pending[path] = time.monotonic() + self.debounce
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
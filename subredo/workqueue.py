@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class Lease:
+    """
+    A Worker's claim on a Project of a WorkQueue, renewed in the background while held.
+
+    Use it as a context manager around processing the Project. If the Lease is found
+    to be lost while held, e.g. reclaimed by another Worker after this one stalled for
+    longer than the lease time, it's marked as lost and no longer renewed.
+    """
+    def __init__(self, queue: WorkQueue, project: Path, path: Path, token: str):
+        self.queue = queue
+        self.project = project
+        self.path = path
+        self.token = token
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew, name=f"Lease {path.stem}", daemon=True)
+
+    def __enter__(self) -> Lease:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _renew(self) -> None:
+        while not self._stop.wait(self.queue.lease_time / 4):
+            try:
+                if self.queue.read_token(self.path) != self.token:
+                    raise FileNotFoundError
+                os.utime(self.path)
+            except FileNotFoundError:
+                self.lost = True
+                return
+            except OSError:
+                continue  # e.g. the network share is briefly unavailable, try again next time
+
+
+class WorkQueue:
+    """
+    A queue of the Projects in a folder, shared by Workers on any amount of machines.
+
+    The queue is a directory, e.g. on the same network share as the Projects, holding a
+    lease file for each Project being processed, and a result file for each Project that
+    was. Workers claim a Project by creating its lease file exclusively, so only one of
+    them gets it, and renew it by touching it while they work. A lease not renewed for
+    the lease time is taken as abandoned by a crashed Worker, and may be reclaimed by
+    another. Finishing a Project records its result, then releases its lease.
+
+    Projects are identified by their path relative to the folder, so the folder may be
+    mounted at a different path on each machine. Lease times are compared against the
+    file server's clock, not the local one, so machines' clocks need not agree.
+    A Project modified since its result was recorded is pending again.
+    """
+    def __init__(self, path: Path, root: Path, lease_time: float = 60.0, worker: Optional[str] = None):
+        self.path = path
+        self.root = root
+        self.lease_time = lease_time
+        self.worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+        for name in ("leases", "results", "clocks"):
+            (path / name).mkdir(parents=True, exist_ok=True)
+
+    def key(self, project: Path) -> str:
+        """Get the key of a Project, the same on every machine."""
+        relative = project.relative_to(self.root).as_posix()
+        return hashlib.blake2b(relative.encode("utf8"), digest_size=12).hexdigest()
+
+    def get_projects(self) -> list[Path]:
+        """Get every Project in the folder, in order."""
+        return sorted(x for x in self.root.rglob("*.Vprj") if self.path not in x.parents)
+
+    def get_server_time(self) -> float:
+        """Get the current time of the file server holding the queue, as it sets modification times."""
+        clock = self.path / "clocks" / f"{self.worker}-{threading.get_ident()}"
+        clock.touch()
+        try:
+            return clock.stat().st_mtime
+        finally:
+            clock.unlink()
+
+    @staticmethod
+    def read_token(path: Path) -> Optional[str]:
+        """Get the token of a lease file, None if it's still being written. Raises FileNotFoundError if gone."""
+        try:
+            return json.loads(path.read_text(encoding="utf8"))["token"]
+        except (ValueError, KeyError):
+            return None
+
+    def get_result(self, project: Path) -> Optional[dict[str, Any]]:
+        """Get the recorded result of a Project, if it was processed and not modified since."""
+        try:
+            result = json.loads((self.path / "results" / f"{self.key(project)}.json").read_text(encoding="utf8"))
+            stat = project.stat()
+        except (OSError, ValueError):
+            return None
+        if result["size"] != stat.st_size or result["mtime"] != stat.st_mtime_ns:
+            return None
+        return result
+
+    def get_status(self, project: Path) -> str:
+        """Get the status of a Project, i.e. pending, leased, done, or failed."""
+        result = self.get_result(project)
+        if result:
+            return FAILED if result["error"] else DONE
+        if (self.path / "leases" / f"{self.key(project)}.lease").exists():
+            return LEASED
+        return PENDING
+
+    def claim(self, project: Path) -> Optional[Lease]:
+        """
+        Claim a Project, reclaiming its lease if it was abandoned.
+
+        Returns the Lease, or None if another Worker holds it. The Project is not checked
+        for a result, and another Worker may have finished it since it was last checked,
+        so check it with get_result() again once claimed.
+        """
+        path = self.path / "leases" / f"{self.key(project)}.lease"
+        token = uuid.uuid4().hex
+        for attempt in range(2):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                if attempt or not self._reclaim(path):
+                    return None
+                continue
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump({
+                    "token": token,
+                    "worker": self.worker,
+                    "project": project.relative_to(self.root).as_posix(),
+                    "claimed": time.time()
+                }, f)
+            return Lease(self, project, path, token)
+        return None
+
+    def _reclaim(self, path: Path) -> bool:
+        """Remove a lease if it was not renewed for the lease time. Returns False if it's still held."""
+        try:
+            token = self.read_token(path)
+            if not self._is_expired(path):
+                return False
+        except FileNotFoundError:
+            return True  # released since
+
+        # of all Workers reclaiming it at once, only the one creating the marker does, and
+        # the lease is never moved away, so a Worker still renewing it never finds it gone
+        marker = path.with_name(f"{path.name}.reclaim")
+        try:
+            os.close(os.open(marker, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            try:
+                if self._is_expired(marker):
+                    marker.unlink()  # left by a Worker that crashed while reclaiming
+            except FileNotFoundError:
+                pass
+            return False
+        try:
+            # it may have been renewed, or released and claimed again, since it was found expired
+            if self.read_token(path) != token or not self._is_expired(path):
+                return False
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return True
+        finally:
+            marker.unlink()
+
+    def _is_expired(self, path: Path) -> bool:
+        """If a file was not modified for the lease time. Raises FileNotFoundError if gone."""
+        return self.get_server_time() - path.stat().st_mtime >= self.lease_time
+
+    def finish(self, lease: Lease, output: Optional[Path] = None, error: Optional[Exception] = None) -> None:
+        """Record the result of a claimed Project, then release its Lease."""
+        stat = lease.project.stat()
+        result = {
+            "project": lease.project.relative_to(self.root).as_posix(),
+            "output": str(output) if output else None,
+            "error": f"{type(error).__name__}: {error}" if error else None,
+            "worker": self.worker,
+            "finished": time.time(),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns
+        }
+        path = self.path / "results" / f"{self.key(lease.project)}.json"
+        partial_path = path.with_name(f".{path.stem}.{self.worker}.partial")
+        partial_path.write_text(json.dumps(result), encoding="utf8")
+        os.replace(partial_path, path)
+        self.release(lease)
+
+    def release(self, lease: Lease) -> None:
+        """Release a Lease, unless it was lost, so the Project can be claimed again right away."""
+        try:
+            if self.read_token(lease.path) == lease.token:
+                lease.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def work(
+    queue: WorkQueue,
+    process: Callable[[Path], Path],
+    retry: bool = False,
+    poll: float = 10.0,
+    on_result: Optional[Callable[[Path, Optional[Path], Optional[Exception], bool], None]] = None
+) -> list[tuple[Path, Optional[Path], Optional[Exception]]]:
+    """
+    Claim and process the Projects of a WorkQueue until none are left.
+
+    Projects that failed are only processed again if retry, and at most once per call.
+    While other Workers hold Projects, the queue is checked again every `poll` seconds,
+    so their Projects are reclaimed if they crash, until every Project is finished.
+    on_result is called with each Project's output or error, and whether its Lease was
+    lost while processing it. Returns the output or error of each Project processed.
+    """
+    results: list[tuple[Path, Optional[Path], Optional[Exception]]] = []
+    attempted: set[str] = set()
+    while True:
+        processed = waiting = False
+        for project in queue.get_projects():
+            key = queue.key(project)
+            result = queue.get_result(project)
+            if key in attempted or (result and (not result["error"] or not retry)):
+                continue
+            lease = queue.claim(project)
+            if not lease:
+                waiting = True
+                continue
+            if queue.get_result(project) != result:
+                queue.release(lease)  # another Worker finished it between checking and claiming it
+                continue
+            attempted.add(key)
+            processed = True
+            output, error = None, None
+            with lease:
+                try:
+                    output = process(project)
+                except Exception as e:
+                    error = e
+                except BaseException:
+                    queue.release(lease)  # e.g. interrupted, leave it to the next Worker
+                    raise
+            queue.finish(lease, output, error)
+            results.append((project, output, error))
+            if on_result:
+                on_result(project, output, error, lease.lost)
+        if not waiting:
+            return results
+        if not processed:
+            time.sleep(poll)
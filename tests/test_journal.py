@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from subredo.journal import DONE, EXPORT, Journal
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.path = self.folder / "batch.journal"
+        self.project = self.folder / "a.Vprj"
+        self.project.write_text("project")
+        self.output = self.folder / "a.mkv"
+        self.output.write_bytes(b"output")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_record_and_reload(self):
+        Journal(self.path).record(self.project, DONE, "abc", self.output)
+        journal = Journal(self.path)
+        self.assertEqual(journal.get(self.project, DONE, "abc"), self.output.resolve())
+        self.assertIsNone(journal.get(self.project, DONE, "def"))
+        self.assertIsNone(journal.get(self.project, EXPORT, "abc"))
+
+    def test_record_after_truncated_line(self):
+        Journal(self.path).record(self.project, EXPORT, "abc", self.output)
+        data = self.path.read_bytes()
+        # crash mid-write of the next entry
+        self.path.write_bytes(data + data[:len(data) // 2])
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.get(self.project, EXPORT, "abc"), self.output.resolve())
+        journal.record(self.project, DONE, "abc", self.output)
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.get(self.project, EXPORT, "abc"), self.output.resolve())
+        self.assertEqual(journal.get(self.project, DONE, "abc"), self.output.resolve())
+
+    def test_modified_output_is_not_used(self):
+        Journal(self.path).record(self.project, DONE, "abc", self.output)
+        self.output.write_bytes(b"modified output")
+        self.assertIsNone(Journal(self.path).get(self.project, DONE, "abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import struct
+import unittest
+from typing import Optional
+
+from subredo import pgs
+from subredo.pgs import END, ODS, PCS, PDS, WDS, DisplaySet, Segment
+from subredo.timeline import TimelineMapper
+from subredo.timestamp import Timestamp
+
+NORMAL = 0x00
+EPOCH_START = 0x80
+
+
+def get_display_set(
+    seconds: int, state: int, composed: tuple[int, ...] = (), defined: Optional[dict[int, int]] = None
+) -> DisplaySet:
+    """Get a Display Set composing the object IDs, and defining the objects, by object ID to version."""
+    pts = seconds * 90000
+    pcs = struct.pack(">HHBHBBBB", 1920, 1080, 0x10, seconds, state, 0, 0, len(composed))
+    pcs += b"".join(struct.pack(">HBBHH", x, 0, 0, 0, 0) for x in composed)
+    segments = [Segment(pts, 0, PCS, pcs)]
+    if state == EPOCH_START:
+        segments.append(Segment(pts, 0, WDS, b"\x01\x00\x00\x00\x00\x00\x07\x80\x04\x38"))
+    if defined:
+        segments.append(Segment(pts, 0, PDS, bytes([0, seconds])))
+        segments.extend(Segment(pts, 0, ODS, struct.pack(">HBB", x, v, 0xC0)) for x, v in defined.items())
+    segments.append(Segment(pts, 0, END, b""))
+    return DisplaySet(segments)
+
+
+def get_definitions(display_set: DisplaySet) -> list[tuple[int, bytes]]:
+    return [(x.type, x.data) for x in display_set.segments if x.type in (WDS, PDS, ODS)]
+
+
+class TestCut(unittest.TestCase):
+    def setUp(self):
+        # 10 s to 20 s are cut
+        self.timeline = TimelineMapper([
+            (Timestamp.from_milliseconds(0), Timestamp.from_milliseconds(10000)),
+            (Timestamp.from_milliseconds(20000), Timestamp.from_milliseconds(30000))
+        ])
+
+    def cut(self, *display_sets: DisplaySet) -> list[DisplaySet]:
+        return list(pgs.cut(display_sets, self.timeline))
+
+    def test_kept_display_sets_are_moved(self):
+        result = self.cut(get_display_set(5, EPOCH_START, (1,), {1: 0}), get_display_set(25, NORMAL))
+        self.assertEqual([x.pts for x in result], [5 * 90000, 15 * 90000])
+
+    def test_caption_shown_before_the_cut_is_cleared(self):
+        result = self.cut(get_display_set(5, EPOCH_START, (1,), {1: 0}), get_display_set(12, NORMAL))
+        self.assertEqual([x.pts for x in result], [5 * 90000, 10 * 90000])
+        self.assertTrue(result[-1].clears)
+
+    def test_object_defined_before_the_cut_is_shown_after_it(self):
+        result = self.cut(
+            get_display_set(5, EPOCH_START, (1,), {1: 0}),
+            get_display_set(8, NORMAL),
+            get_display_set(12, NORMAL, (1,)),
+            get_display_set(14, NORMAL),
+            get_display_set(22, NORMAL, (1,))
+        )
+        # shown and cleared again within the cut, nothing is left to do at the cut
+        self.assertEqual([x.pts for x in result], [5 * 90000, 8 * 90000, 12 * 90000])
+
+    def test_held_display_sets_are_collapsed_keeping_definitions(self):
+        result = self.cut(
+            get_display_set(5, EPOCH_START, (1,), {1: 0}),
+            get_display_set(12, NORMAL, (1,), {1: 1, 2: 0}),
+            get_display_set(14, NORMAL),
+            get_display_set(22, NORMAL, (2,))
+        )
+        self.assertEqual([x.pts for x in result], [5 * 90000, 10 * 90000, 12 * 90000])
+        held = result[1]
+        self.assertTrue(held.clears)
+        self.assertEqual({x.pts for x in held.segments}, {10 * 90000})
+        self.assertEqual([x.type for x in held.segments], [PCS, PDS, ODS, ODS, END])
+        self.assertEqual(get_definitions(held)[1:], [(ODS, b"\x00\x01\x01\xc0"), (ODS, b"\x00\x02\x00\xc0")])
+
+    def test_held_epoch_start_resets_definitions(self):
+        result = self.cut(
+            get_display_set(11, NORMAL, (1,), {1: 1}),
+            get_display_set(12, EPOCH_START, (2,), {2: 0}),
+            get_display_set(14, NORMAL),
+            get_display_set(22, NORMAL, (2,))
+        )
+        self.assertEqual([x.pts for x in result], [10 * 90000, 12 * 90000])
+        held = result[0]
+        self.assertTrue(held.epoch_start)
+        self.assertTrue(held.clears)
+        self.assertEqual([x.type for x in held.segments], [PCS, WDS, PDS, ODS, END])
+        self.assertEqual(get_definitions(held)[-1], (ODS, b"\x00\x02\x00\xc0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from subredo.pipeline import get_track_ids, get_track_options
+from subredo.probe import TextTrack
+
+
+def get_subtitle(stream_index, track_id, language="en") -> TextTrack:
+    return TextTrack(stream_index, track_id, "UTF-8", language, None, False, False)
+
+
+def get_track(id_, type_, number) -> dict:
+    return {"id": id_, "type": type_, "properties": {"number": number}}
+
+
+# a video, an audio, and two Subtitle tracks, as mkvmerge identifies them
+TRACKS = [
+    get_track(0, "video", 1),
+    get_track(1, "audio", 2),
+    get_track(2, "subtitles", 3),
+    get_track(3, "subtitles", 4)
+]
+
+
+class TestGetTrackIds(unittest.TestCase):
+    def test_tracks_are_matched_on_their_number(self):
+        subtitles = [get_subtitle(0, 3), get_subtitle(1, 4)]
+        self.assertEqual(get_track_ids(TRACKS, subtitles), {0: 2, 1: 3})
+        self.assertEqual(get_track_ids(TRACKS, subtitles[::-1]), {0: 2, 1: 3})
+
+    def test_text_tracks_within_other_tracks_are_left_out(self):
+        # MediaInfo also lists EIA-608 captions within the video, before the Subtitle tracks
+        subtitles = [get_subtitle(0, "1-CC1"), get_subtitle(1, 3), get_subtitle(2, 4)]
+        self.assertEqual(get_track_ids(TRACKS, subtitles), {1: 2, 2: 3})
+
+    def test_disagreeing_tracks_raise(self):
+        with self.assertRaises(ValueError):
+            get_track_ids(TRACKS, [get_subtitle(0, 3)])
+        with self.assertRaises(ValueError):
+            get_track_ids(TRACKS, [get_subtitle(0, 3), get_subtitle(1, 4), get_subtitle(2, 5)])
+        with self.assertRaises(ValueError):
+            get_track_ids(TRACKS, [get_subtitle(0, 2), get_subtitle(1, 3)])
+
+
+class TestGetTrackOptions(unittest.TestCase):
+    def setUp(self):
+        self.subtitles = [get_subtitle(0, "1-CC1"), get_subtitle(1, 3, "fr"), get_subtitle(2, 4)]
+        self.track_ids = get_track_ids(TRACKS, self.subtitles)
+
+    def test_flags_and_offset(self):
+        self.assertEqual(get_track_options(self.track_ids, self.subtitles, "en", 0), [
+            "--original-flag", "2:False", "--original-flag", "3:True"
+        ])
+        self.assertEqual(get_track_options(self.track_ids, self.subtitles, "en", -500), [
+            "--original-flag", "2:False", "--sync", "2:-500", "--original-flag", "3:True", "--sync", "3:-500"
+        ])
+
+    def test_skipped_track_before_kept_track(self):
+        self.assertEqual(get_track_options(self.track_ids, self.subtitles, "en", 0, {1}), [
+            "--original-flag", "3:True", "--subtitle-tracks", "3"
+        ])
+
+    def test_skipped_track_within_other_track(self):
+        self.assertEqual(get_track_options(self.track_ids, self.subtitles, "en", 0, {0}), [
+            "--original-flag", "2:False", "--original-flag", "3:True", "--subtitle-tracks", "2,3"
+        ])
+
+    def test_every_track_skipped(self):
+        self.assertEqual(get_track_options(self.track_ids, self.subtitles, "en", 0, {1, 2}), ["--no-subtitles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from subredo.planner import plan_cuts
+from subredo.timestamp import TICKS_PER_MS
+
+FRAME_25 = 40 * TICKS_PER_MS  # 25 FPS
+FRAME_2997 = 333667  # 29.97 FPS, 33.3667 ms
+DURATION = 60000 * TICKS_PER_MS
+
+
+def is_applied(length: int, frame: int, start: int = 1000 * TICKS_PER_MS) -> bool:
+    """If a cut of a length in ticks is applied, rather than dropped as too short to matter."""
+    return bool(plan_cuts([(start, start + length)], DURATION, frame).cuts)
+
+
+class TestPlanCuts(unittest.TestCase):
+    def test_short_cuts_are_dropped_like_before(self):
+        # a cut must remove more whole milliseconds than a frame, rounded up to a whole millisecond
+        self.assertFalse(is_applied(40 * TICKS_PER_MS, FRAME_25))
+        self.assertFalse(is_applied(400760, FRAME_25))
+        self.assertTrue(is_applied(41 * TICKS_PER_MS, FRAME_25))
+        self.assertFalse(is_applied(333700, FRAME_2997))
+        self.assertFalse(is_applied(349900, FRAME_2997))
+        self.assertTrue(is_applied(35 * TICKS_PER_MS, FRAME_2997))
+
+    def test_whole_milliseconds_are_compared(self):
+        # 40.2 ms spanning 41 millisecond boundaries removes more than a 40 ms frame
+        self.assertTrue(is_applied(402000, FRAME_25, start=1000 * TICKS_PER_MS + 9000))
+
+    def test_without_frame(self):
+        # only cuts within a single millisecond are dropped
+        self.assertTrue(is_applied(TICKS_PER_MS, 0))
+        self.assertFalse(is_applied(TICKS_PER_MS // 2, 0, start=1000 * TICKS_PER_MS + 1))
+
+    def test_segments_are_shrunk_by_a_frame(self):
+        plan = plan_cuts([(1000 * TICKS_PER_MS, 2000 * TICKS_PER_MS)], DURATION, FRAME_25)
+        self.assertEqual(plan.cuts, [(960 * TICKS_PER_MS, 1960 * TICKS_PER_MS)])
+        self.assertEqual(plan.segments, [(FRAME_25, 920 * TICKS_PER_MS), (2000 * TICKS_PER_MS, DURATION)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import io
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from subredo.watch import Watcher, get_filesystem
+
+MOUNTINFO = """\
+22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw
+40 22 0:35 / /mnt/media rw,relatime shared:20 - cifs //nas/media rw,vers=3.1.1
+41 40 259:3 / /mnt/media/local rw,relatime shared:21 - ext4 /dev/nvme0n1p3 rw
+42 22 0:36 / /mnt/my\\040share rw,relatime shared:22 - nfs4 nas:/share rw
+"""
+
+
+class TestGetFilesystem(unittest.TestCase):
+    def get_filesystem(self, path: str):
+        with mock.patch("subredo.watch.open", return_value=io.StringIO(MOUNTINFO), create=True):
+            with mock.patch.object(Path, "resolve", lambda x: x):
+                return get_filesystem(Path(path))
+
+    def test_longest_mount_point_is_used(self):
+        self.assertEqual(self.get_filesystem("/home/user"), "ext4")
+        self.assertEqual(self.get_filesystem("/mnt/media"), "cifs")
+        self.assertEqual(self.get_filesystem("/mnt/media/Shows"), "cifs")
+        self.assertEqual(self.get_filesystem("/mnt/media/local/Shows"), "ext4")
+        self.assertEqual(self.get_filesystem("/mnt/mediaserver"), "ext4")
+
+    def test_escaped_mount_point(self):
+        self.assertEqual(self.get_filesystem("/mnt/my share/Shows"), "nfs4")
+
+    def test_network_filesystem_is_polled(self):
+        with mock.patch("subredo.watch.get_filesystem", return_value="cifs"), \
+                mock.patch("subredo.watch.platform.system", return_value="Linux"), \
+                mock.patch.object(Watcher, "_inotify_init", return_value=0) as inotify_init, \
+                mock.patch.object(Watcher, "_scan", return_value={}):
+            self.assertTrue(Watcher(Path("/mnt/media")).polling)
+            inotify_init.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from subredo.workqueue import DONE, FAILED, LEASED, PENDING, WorkQueue, work
+
+
+def process(project: Path) -> Path:
+    # record each time the Project is processed, by which Worker
+    with open(project.with_suffix(".log"), "a", encoding="utf8") as f:
+        f.write(f"{os.getpid()}\n")
+    time.sleep(0.02)
+    return project.with_suffix(".mkv")
+
+
+def run_worker(queue_dir: Path, root: Path, start) -> None:
+    start.wait()
+    work(WorkQueue(queue_dir, root, lease_time=5), process, poll=0.1)
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for name in ("a.Vprj", "b/c.Vprj"):
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_text(name)
+        self.queue_dir = self.root / ".subredo-queue"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_queue(self, worker: str) -> WorkQueue:
+        return WorkQueue(self.queue_dir, self.root, lease_time=5, worker=worker)
+
+    def test_every_project_is_processed_once(self):
+        processed = []
+        results = work(self.get_queue("a"), lambda x: processed.append(x) or x.with_suffix(".mkv"))
+        self.assertEqual(processed, [self.root / "a.Vprj", self.root / "b/c.Vprj"])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(work(self.get_queue("b"), lambda x: processed.append(x) or x), [])
+        self.assertEqual(len(processed), 2)
+
+    def test_every_project_is_processed_once_by_concurrent_workers(self):
+        for i in range(20):
+            (self.root / f"d/{i:02}.Vprj").parent.mkdir(exist_ok=True)
+            (self.root / f"d/{i:02}.Vprj").write_text(str(i))
+        queue = self.get_queue("a")
+        projects = queue.get_projects()
+
+        start = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(self.queue_dir, self.root, start))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        for project in projects:
+            self.assertEqual(len(project.with_suffix(".log").read_text(encoding="utf8").splitlines()), 1, project)
+            self.assertEqual(queue.get_status(project), DONE)
+        # every Worker got to process some of them
+        pids = {project.with_suffix(".log").read_text(encoding="utf8") for project in projects}
+        self.assertGreater(len(pids), 1)
+
+    def test_status(self):
+        queue = self.get_queue("a")
+        project = self.root / "a.Vprj"
+        self.assertEqual(queue.get_status(project), PENDING)
+        lease = queue.claim(project)
+        self.assertEqual(queue.get_status(project), LEASED)
+        self.assertIsNone(self.get_queue("b").claim(project))
+        queue.finish(lease, error=ValueError("Failed"))
+        self.assertEqual(queue.get_status(project), FAILED)
+        queue.finish(queue.claim(project), project.with_suffix(".mkv"))
+        self.assertEqual(queue.get_status(project), DONE)
+        project.write_text("modified")
+        self.assertEqual(queue.get_status(project), PENDING)
+
+    def test_project_finished_before_claiming_is_skipped(self):
+        other = self.get_queue("b")
+        queue = self.get_queue("a")
+        claim = queue.claim
+
+        def claim_after_other(project: Path):
+            # the other Worker claims and finishes it after this one found it pending
+            other.finish(other.claim(project), project.with_suffix(".mkv"))
+            return claim(project)
+
+        queue.claim = claim_after_other
+        processed = []
+        self.assertEqual(work(queue, lambda x: processed.append(x) or x), [])
+        self.assertEqual(processed, [])
+        self.assertEqual(list((self.queue_dir / "leases").iterdir()), [])
+
+    def expire(self, path: Path) -> None:
+        past = time.time() - 60
+        os.utime(path, (past, past))
+
+    def test_expired_lease_is_reclaimed(self):
+        project = self.root / "a.Vprj"
+        lease = self.get_queue("a").claim(project)
+        self.assertIsNone(self.get_queue("b").claim(project))
+        self.expire(lease.path)
+        reclaimed = self.get_queue("b").claim(project)
+        self.assertIsNotNone(reclaimed)
+        self.assertEqual(WorkQueue.read_token(lease.path), reclaimed.token)
+        self.assertEqual(list((self.queue_dir / "leases").iterdir()), [lease.path])
+
+    def test_lease_being_reclaimed_is_left_alone(self):
+        project = self.root / "a.Vprj"
+        lease = self.get_queue("a").claim(project)
+        marker = lease.path.with_name(f"{lease.path.name}.reclaim")
+        marker.touch()  # another Worker is reclaiming it
+        self.expire(lease.path)
+        self.assertIsNone(self.get_queue("b").claim(project))
+        self.assertEqual(WorkQueue.read_token(lease.path), lease.token)
+
+    def test_marker_of_crashed_worker_is_removed(self):
+        project = self.root / "a.Vprj"
+        lease = self.get_queue("a").claim(project)
+        marker = lease.path.with_name(f"{lease.path.name}.reclaim")
+        marker.touch()
+        self.expire(marker)
+        self.expire(lease.path)
+        self.assertIsNone(self.get_queue("b").claim(project))
+        self.assertFalse(marker.exists())
+        self.assertIsNotNone(self.get_queue("b").claim(project))
+
+    def test_renewed_lease_is_not_reclaimed(self):
+        project = self.root / "a.Vprj"
+        lease = self.get_queue("a").claim(project)
+        self.expire(lease.path)
+        os.utime(lease.path)
+        self.assertIsNone(self.get_queue("b").claim(project))
+        self.assertEqual(WorkQueue.read_token(lease.path), lease.token)
+
+
+if __name__ == "__main__":
+    unittest.main()